@@ -8,6 +8,9 @@ for the Mindhive AI Chatbot assessment.
 Modules:
 - main: FastAPI application entry point
 - calculator: Calculator service for mathematical expressions
+- cache: In-process TTL/LRU cache shared by the API services
+- batcher: Micro-batching of concurrent blocking service calls
+- responses: JSON rendering shared by the endpoints
 - products: RAG product search service (Phase 4)
 - outlets: Text2SQL outlet query service (Phase 4)
 """
@@ -0,0 +1,145 @@
+"""
+Request Batching
+================
+
+Micro-batching for blocking service calls made by concurrent API requests.
+
+Requests submitted while a batch is being collected are grouped and handed
+to a single batch function call (e.g. one encoder pass and one FAISS search
+for many product queries) that runs in the thread pool.
+
+Features:
+- Bounded batches with a maximum collection wait
+- Per-request futures so each caller only awaits its own result
+- Background consumer task started and stopped by the application lifespan
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 32
+MAX_WAIT_MS = 75
+
+
+class QueryBatcher:
+    """
+    Coalesces concurrent submissions into batched calls of a blocking function.
+    
+    The batch function receives a list of submitted items and must return a
+    list of results in the same order.
+    """
+    
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 batch_size: int = BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        """
+        Initialize the batcher.
+        
+        Args:
+            process_batch: Blocking function mapping a list of items to a list of results
+            batch_size: Maximum number of items per batch
+            max_wait_ms: Longest time to keep collecting items after the first arrives
+        """
+        self.process_batch = process_batch
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "Optional[asyncio.Queue[Tuple[Any, asyncio.Future]]]" = None
+        self._consumer: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background consumer is accepting submissions."""
+        return self._consumer is not None and not self._consumer.done()
+    
+    def start(self):
+        """Start the background consumer on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._consumer = asyncio.create_task(self._consume())
+    
+    async def stop(self):
+        """Stop the consumer and fail any submissions still waiting."""
+        if self._consumer is None:
+            return
+        self._consumer.cancel()
+        try:
+            await self._consumer
+        except asyncio.CancelledError:
+            pass
+        self._consumer = None
+        
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+    
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item for the next batch and wait for its result.
+        
+        Args:
+            item: Item to process
+        
+        Returns:
+            The batch function's result for this item
+        """
+        if not self.running:
+            # No consumer (e.g. lifespan not started): process on its own
+            results = await run_in_threadpool(self.process_batch, [item])
+            return results[0]
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    async def _collect_batch(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for one item, then gather more until the batch is full or the wait expires."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _consume(self):
+        """Process queued submissions batch by batch until cancelled."""
+        while True:
+            batch = await self._collect_batch()
+            
+            # Callers that gave up (e.g. disconnected clients) are skipped
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            
+            try:
+                results = await run_in_threadpool(self.process_batch, [item for item, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.error("Batch of %d items failed: %s", len(batch), e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
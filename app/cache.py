@@ -0,0 +1,209 @@
+"""
+Cache Utilities
+===============
+
+Small in-process caches shared by the API services.
+
+Features:
+- Bounded LRU eviction
+- Per-entry time-to-live using a monotonic clock (optionally sliding on access)
+- Thread-safe access for handlers running in the thread pool
+- Similarity lookup over recent query embeddings (semantic cache)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed time-to-live.
+    
+    Expired entries are dropped lazily when they are looked up (or in bulk
+    via purge_expired), and the least recently used entry is evicted once
+    the cache is full.
+    """
+    
+    def __init__(self, maxsize: int = 512, ttl: float = 300.0, sliding: bool = False):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries to keep
+            ttl: Seconds an entry stays valid after it is stored
+            sliding: Restart an entry's time-to-live whenever it is read
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sliding = sliding
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            
+            if self.sliding:
+                self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """
+        Remove an entry.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The removed value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+    
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """
+        Snapshot of the live entries, least recently used first.
+        
+        Returns:
+            List of (key, value) pairs that have not expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at > now]
+    
+    def purge_expired(self) -> int:
+        """
+        Drop every expired entry.
+        
+        Returns:
+            Number of entries removed
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+            return len(expired)
+    
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticCache:
+    """
+    Fixed-size cache of values keyed by L2-normalized embeddings.
+    
+    A lookup returns the value stored for the most similar embedding when its
+    cosine similarity reaches the threshold. Entries are kept in a ring
+    buffer, so the oldest entry is overwritten once the cache is full.
+    """
+    
+    def __init__(self, dim: int, maxsize: int = 2048, threshold: float = 0.97):
+        """
+        Initialize the cache.
+        
+        Args:
+            dim: Embedding dimension
+            maxsize: Maximum number of embeddings to keep
+            threshold: Minimum cosine similarity for a hit
+        """
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._embeddings = np.zeros((maxsize, dim), dtype=np.float32)
+        self._entries: List[Tuple[Hashable, Any]] = []
+        self._next = 0
+        self._lock = threading.Lock()
+    
+    def get(self, embedding: np.ndarray, tag: Hashable = None) -> Optional[Any]:
+        """
+        Find the value stored for the nearest cached embedding.
+        
+        Args:
+            embedding: L2-normalized query embedding
+            tag: Only entries stored with an equal tag can match
+                 (e.g. the number of results requested)
+        
+        Returns:
+            Cached value, or None if no entry is similar enough
+        """
+        with self._lock:
+            if not self._entries:
+                return None
+            
+            similarities = self._embeddings[:len(self._entries)] @ embedding
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for position in candidates[np.argsort(-similarities[candidates])]:
+                entry_tag, value = self._entries[position]
+                if entry_tag == tag:
+                    return value
+            return None
+    
+    def set(self, embedding: np.ndarray, value: Any, tag: Hashable = None) -> None:
+        """
+        Store a value under an embedding, overwriting the oldest entry if full.
+        
+        Args:
+            embedding: L2-normalized embedding
+            value: Value to cache
+            tag: Tag that lookups must match
+        """
+        with self._lock:
+            self._embeddings[self._next] = embedding
+            if len(self._entries) < self.maxsize:
+                self._entries.append((tag, value))
+            else:
+                self._entries[self._next] = (tag, value)
+            self._next = (self._next + 1) % self.maxsize
+    
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._next = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
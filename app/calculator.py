@@ -6,39 +6,163 @@ Safe mathematical expression evaluation service with comprehensive error handlin
 """
 
 import ast
+import functools
 import operator
 import re
-from typing import Union, Dict, Any
+import types
+from typing import Union, Dict, Any, Optional, List, Tuple, Callable
 import math
 
 
+# Longest expression accepted; caps parse/evaluation cost for hostile input
+MAX_EXPRESSION_LENGTH = 256
+
+# Normalized expressions whose results each calculator memoizes (ints/floats are immutable)
+EVAL_CACHE_SIZE = 2048
+
+# Characters accepted before normalization (digits, operators, ^ × ÷, parentheses,
+# decimal points, whitespace); used by the API layer to reject input up front
+EXPRESSION_PATTERN = r'^[0-9+\-*/().\s%^×÷]+$'
+
+# Supported binary operations
+_BINARY_OPS = {
+    ast.Add: operator.add,       # +
+    ast.Sub: operator.sub,       # -
+    ast.Mult: operator.mul,      # *
+    ast.Div: operator.truediv,   # /
+    ast.Mod: operator.mod,       # %
+    ast.Pow: operator.pow,       # ** or ^
+}
+
+# Supported unary operations
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,      # +x
+    ast.USub: operator.neg,      # -x
+}
+
+# Supported mathematical functions
+_FUNCTIONS = {
+    'sqrt': math.sqrt,
+    'abs': abs,
+    'round': round,
+}
+
+# Single-character symbol replacements (× → *, ÷ → /)
+_SYMBOL_TRANS = str.maketrans({'×': '*', '÷': '/'})
+
+# Precompiled pattern for the remaining rewrites: ^ → ** and whitespace runs → single space
+_NORMALIZE_RE = re.compile(r'\^|\s+')
+
+# Translation table that deletes every allowed character; anything left over is invalid
+_ALLOWED_CHARS = '0123456789+-*/().% \t\n\r\f\v'
+_DISALLOWED_TRANS = str.maketrans('', '', _ALLOWED_CHARS)
+
+# Substrings rejected outright, matched case-insensitively in one scan
+_DANGEROUS_RE = re.compile(r'__|import|exec|eval|open', re.IGNORECASE)
+
+
+# Tokenizer for the arithmetic-only fast path: a number or an operator/parenthesis
+_TOKEN_RE = re.compile(r'\s*(?:(\d+\.?\d*|\.\d+)|(\*\*|[-+*/%()]))')
+
+# Integer op codes for the fast-path program: (kind, value) pairs where kind is
+# _OP_PUSH for a number literal, otherwise one of the operator codes below
+_OP_PUSH = -1
+_OP_ADD, _OP_SUB, _OP_MUL, _OP_DIV, _OP_MOD, _OP_POW, _OP_POS, _OP_NEG = range(8)
+
+# Operator implementations indexed by op code, taken from the shared dispatch tables
+_OP_FUNCS = (
+    _BINARY_OPS[ast.Add], _BINARY_OPS[ast.Sub], _BINARY_OPS[ast.Mult],
+    _BINARY_OPS[ast.Div], _BINARY_OPS[ast.Mod], _BINARY_OPS[ast.Pow],
+    _UNARY_OPS[ast.UAdd], _UNARY_OPS[ast.USub],
+)
+
+# Shunting-yard precedence indexed by op code (prefix +/- sit between * and **)
+_OP_PRECEDENCE = (1, 1, 2, 2, 2, 4, 3, 3)
+
+# Token -> op code, depending on whether an operand or an operator is expected
+_BINARY_TOKENS = {'+': _OP_ADD, '-': _OP_SUB, '*': _OP_MUL, '/': _OP_DIV, '%': _OP_MOD, '**': _OP_POW}
+_PREFIX_TOKENS = {'+': _OP_POS, '-': _OP_NEG}
+
+# A single binary operation on two non-negative integer literals, e.g. "2+3" or "10 * 5".
+# Powers are left to the full pipeline so their results get the same validation.
+_SIMPLE_BINOP_RE = re.compile(r'(0|[1-9][0-9]*) *([-+*/%]) *(0|[1-9][0-9]*)')
+
+# Runtime specialization: once a well-formed expression shape (operators with the
+# numbers blanked out) has been evaluated this many times, generate a function for it
+_SPECIALIZE_AFTER = 3
+_MAX_SPECIALIZED_SHAPES = 256
+_SHAPE_COUNTS: Dict[tuple, int] = {}
+_SHAPE_FUNCTIONS: Dict[tuple, Callable[..., Union[int, float]]] = {}
+
+# Operators whose zero checks live in _run_program; shapes using them stay interpreted
+_GUARDED_TOKENS = frozenset({'/', '%'})
+
+
+def _record_shape(shape: tuple) -> None:
+    """Count a well-formed expression shape and specialize it once it is hot."""
+    if len(_SHAPE_FUNCTIONS) >= _MAX_SPECIALIZED_SHAPES or _GUARDED_TOKENS.intersection(shape):
+        return
+    
+    count = _SHAPE_COUNTS.get(shape, 0) + 1
+    if count < _SPECIALIZE_AFTER:
+        if len(_SHAPE_COUNTS) >= _MAX_SPECIALIZED_SHAPES * 4:
+            _SHAPE_COUNTS.clear()
+        _SHAPE_COUNTS[shape] = count
+        return
+    
+    _SHAPE_COUNTS.pop(shape, None)
+    _SHAPE_FUNCTIONS[shape] = _build_shape_function(shape)
+
+
+def _build_shape_function(shape: tuple) -> Callable[..., Union[int, float]]:
+    """
+    Generate a function evaluating one expression shape directly.
+    
+    The source only ever contains whitelisted operator tokens and generated
+    parameter names, and shapes are recorded only after the shunting-yard pass
+    accepted them, so the generated body is always plain arithmetic. Shapes
+    with / or % are never specialized, so zero divisors keep the interpreter's
+    error messages.
+    
+    Args:
+        shape: Token tuple with None in place of each number literal
+        
+    Returns:
+        Function taking the literals positionally and returning the result
+    """
+    params = []
+    parts = []
+    for token in shape:
+        if token is None:
+            params.append(f"a{len(params)}")
+            parts.append(params[-1])
+        else:
+            parts.append(token)
+    
+    source = f"def _specialized({', '.join(params)}):\n    return {' '.join(parts)}\n"
+    namespace: Dict[str, Any] = {'__builtins__': {}}
+    exec(compile(source, '<calc-shape>', 'exec'), namespace)
+    return namespace['_specialized']
+
+
+def _normalize_match(match: re.Match) -> str:
+    """Replacement callback for _NORMALIZE_RE."""
+    return '**' if match.group() == '^' else ' '
+
+
 class CalculatorService:
     """Safe calculator service for mathematical expression evaluation."""
     
+    # Operation tables are stateless, so every instance shares the module-level constants
+    binary_ops = _BINARY_OPS
+    unary_ops = _UNARY_OPS
+    functions = _FUNCTIONS
+    
     def __init__(self):
-        """Initialize the calculator with supported operations."""
-        # Supported binary operations
-        self.binary_ops = {
-            ast.Add: operator.add,       # +
-            ast.Sub: operator.sub,       # -
-            ast.Mult: operator.mul,      # *
-            ast.Div: operator.truediv,   # /
-            ast.Mod: operator.mod,       # %
-            ast.Pow: operator.pow,       # ** or ^
-        }
-        
-        # Supported unary operations
-        self.unary_ops = {
-            ast.UAdd: operator.pos,      # +x
-            ast.USub: operator.neg,      # -x
-        }
-        
-        # Supported mathematical functions
-        self.functions = {
-            'sqrt': math.sqrt,
-            'abs': abs,
-            'round': round,
-        }
+        """Initialize the calculator and its memoized evaluator."""
+        # Each instance memoizes its own _evaluate_normalized, so subclasses and
+        # separately configured instances never see another instance's results
+        self._eval_cached = functools.lru_cache(maxsize=EVAL_CACHE_SIZE)(self._evaluate_normalized)
     
     def evaluate_expression(self, expression: str) -> Union[int, float]:
         """
@@ -54,31 +178,89 @@ class CalculatorService:
             ValueError: For invalid expressions or unsupported operations
             ZeroDivisionError: For division by zero
         """
-        if not expression or not expression.strip():
+        if not isinstance(expression, str):
+            raise ValueError("Expression must be a string")
+        
+        if len(expression) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(f"Expression too long (maximum {MAX_EXPRESSION_LENGTH} characters)")
+        
+        expression = expression.strip()
+        if not expression:
             raise ValueError("Expression cannot be empty")
         
-        # Clean and normalize the expression
-        expression = self._normalize_expression(expression.strip())
+        # Bare numbers and single integer binops skip normalization, parsing and the cache
+        result = self._evaluate_trivial(expression)
+        if result is not None:
+            return result
+        
+        # Clean and normalize the expression, then delegate to the memoized evaluator
+        return self._eval_cached(self._normalize_expression(expression))
+    
+    def _evaluate_trivial(self, expression: str) -> Optional[Union[int, float]]:
+        """
+        Evaluate a bare number or a single integer binary operation directly.
+        
+        Args:
+            expression: Stripped expression string
+            
+        Returns:
+            Numerical result, or None if the expression needs the full pipeline
+        """
+        digits = expression[1:] if expression[0] == '-' else expression
+        if digits.isascii() and digits.replace('.', '', 1).isdigit():
+            if '.' in digits:
+                return float(expression)
+            if len(digits) > 1 and digits[0] == '0':
+                return None  # Leading zeros are a syntax error; let ast report it
+            return int(expression)
+        
+        match = _SIMPLE_BINOP_RE.fullmatch(expression)
+        if match:
+            left, token, right = match.groups()
+            code = _BINARY_TOKENS[token]
+            right = int(right)
+            if right == 0 and code == _OP_DIV:
+                raise ZeroDivisionError("Division by zero")
+            if right == 0 and code == _OP_MOD:
+                raise ZeroDivisionError("Modulo by zero")
+            return _OP_FUNCS[code](int(left), right)
+        
+        return None
+    
+    def _evaluate_normalized(self, expression: str) -> Union[int, float]:
+        """
+        Validate, parse and evaluate an already-normalized expression.
         
+        Args:
+            expression: Normalized mathematical expression string
+            
+        Returns:
+            Numerical result of the expression
+        """
         # Validate expression format
         self._validate_expression(expression)
         
         try:
-            # Parse the expression into an AST
-            tree = ast.parse(expression, mode='eval')
+            # Try the tokenizer-based fast path first
+            result = self._fast_eval(expression)
             
-            # Evaluate the AST safely
-            result = self._evaluate_node(tree.body)
+            if result is None:
+                # Parse, whitelist and compile the expression (cached), then run the bytecode
+                code = _compile_expression(expression)
+                result = eval(code, _EVAL_GLOBALS, {})
             
-            # Validate result
-            if not isinstance(result, (int, float)):
-                raise ValueError(f"Invalid result type: {type(result)}")
-            
-            if math.isnan(result):
-                raise ValueError("Result is not a number")
-            
-            if math.isinf(result):
-                raise ValueError("Result is infinite")
+            # Validate result. Literals are int/float only and bounded by
+            # MAX_EXPRESSION_LENGTH, so + - * / % can't leave the finite reals;
+            # only powers can produce complex, infinite or NaN results.
+            if '**' in expression:
+                if isinstance(result, complex):
+                    raise ValueError("Complex numbers are not supported")
+                
+                if math.isnan(result):
+                    raise ValueError("Result is not a number")
+                
+                if math.isinf(result):
+                    raise ValueError("Result is infinite")
             
             return result
             
@@ -90,79 +272,225 @@ class CalculatorService:
     def _normalize_expression(self, expression: str) -> str:
         """Normalize the expression for consistent parsing."""
         # Replace common alternative symbols
-        expression = expression.replace('^', '**')  # Convert ^ to **
-        expression = expression.replace('×', '*')   # Convert × to *
-        expression = expression.replace('÷', '/')   # Convert ÷ to /
+        expression = expression.translate(_SYMBOL_TRANS)
         
-        # Remove extra whitespace
-        expression = re.sub(r'\s+', ' ', expression)
-        
-        return expression
+        # Convert ^ to ** and remove extra whitespace in a single pass
+        return _NORMALIZE_RE.sub(_normalize_match, expression)
     
     def _validate_expression(self, expression: str) -> None:
         """Validate that the expression contains only allowed characters."""
         # Allow digits, operators, parentheses, decimal points
-        allowed_pattern = r'^[0-9+\-*/().\s%*]+$'
-        
-        if not re.match(allowed_pattern, expression):
+        if expression.translate(_DISALLOWED_TRANS):
             raise ValueError("Expression contains invalid characters")
         
-        # Check for potentially dangerous patterns
-        dangerous_patterns = ['__', 'import', 'exec', 'eval', 'open']
-        
-        expression_lower = expression.lower()
-        for pattern in dangerous_patterns:
-            if pattern in expression_lower:
-                raise ValueError(f"Potentially dangerous pattern detected: {pattern}")
-    
-    def _evaluate_node(self, node: ast.AST) -> Union[int, float]:
-        """Recursively evaluate an AST node."""
-        if isinstance(node, ast.Constant):  # Python 3.8+
-            return node.value
-        elif isinstance(node, ast.Num):  # Python < 3.8
-            return node.n
-        elif isinstance(node, ast.BinOp):
-            left = self._evaluate_node(node.left)
-            right = self._evaluate_node(node.right)
-            op = self.binary_ops.get(type(node.op))
-            
-            if not op:
-                raise ValueError(f"Unsupported binary operation: {type(node.op)}")
-            
-            # Special handling for division by zero
-            if isinstance(node.op, ast.Div) and right == 0:
-                raise ZeroDivisionError("Division by zero")
+        # Check for potentially dangerous patterns in a single pass
+        match = _DANGEROUS_RE.search(expression)
+        if match:
+            raise ValueError(f"Potentially dangerous pattern detected: {match.group().lower()}")
+    
+    def _fast_eval(self, expression: str) -> Optional[Union[int, float]]:
+        """
+        Evaluate plain arithmetic without ast.parse.
+        
+        Expression shapes seen often enough are served by a generated function;
+        everything else runs through the shunting-yard program.
+        
+        Args:
+            expression: Normalized and validated expression string
             
-            # Special handling for modulo by zero
-            if isinstance(node.op, ast.Mod) and right == 0:
-                raise ZeroDivisionError("Modulo by zero")
+        Returns:
+            Numerical result, or None if the expression should take the AST path
+        """
+        tokens = self._tokenize(expression)
+        if tokens is None:
+            return None
+        
+        # Operators stay in the shape; number literals become positional arguments
+        shape = tuple(token if isinstance(token, str) else None for token in tokens)
+        specialized = _SHAPE_FUNCTIONS.get(shape)
+        if specialized is not None:
+            return specialized(*[token for token in tokens if not isinstance(token, str)])
+        
+        program = self._compile_program(tokens)
+        if program is None:
+            return None
+        
+        _record_shape(shape)
+        return self._run_program(program)
+    
+    def _tokenize(self, expression: str) -> Optional[List[Union[int, float, str]]]:
+        """
+        Split an expression into number literals and operator/parenthesis strings.
+        
+        Args:
+            expression: Normalized and validated expression string
             
-            result = op(left, right)
+        Returns:
+            List of tokens, or None for anything the tokenizer doesn't recognise
+        """
+        tokens = []
+        position = 0
+        length = len(expression)
+        
+        while position < length:
+            match = _TOKEN_RE.match(expression, position)
+            if not match:
+                return None
+            position = match.end()
+            number, token = match.groups()
             
-            # Ensure we don't return complex numbers
-            if isinstance(result, complex):
-                raise ValueError("Complex numbers are not supported")
+            if number is None:
+                tokens.append(token)
+            elif '.' in number:
+                tokens.append(float(number))
+            elif len(number) > 1 and number[0] == '0':
+                return None  # Leading zeros are a syntax error; let ast report it
+            else:
+                tokens.append(int(number))
+        
+        return tokens
+    
+    def _compile_program(self, tokens: List[Union[int, float, str]]) -> Optional[List[Tuple[int, Any]]]:
+        """
+        Convert tokens into a reverse Polish program with a shunting-yard pass.
+        
+        Args:
+            tokens: Output of _tokenize
             
-            return result
+        Returns:
+            List of (op code, value) pairs, or None if the tokens aren't a
+            well-formed expression (the AST path then reports the error)
+        """
+        program = []     # Output in reverse Polish order
+        operators = []   # Pending op codes; None marks an open parenthesis
+        expect_operand = True
         
-        elif isinstance(node, ast.UnaryOp):
-            operand = self._evaluate_node(node.operand)
-            op = self.unary_ops.get(type(node.op))
+        for token in tokens:
+            if not isinstance(token, str):
+                if not expect_operand:
+                    return None
+                program.append((_OP_PUSH, token))
+                expect_operand = False
             
-            if not op:
-                raise ValueError(f"Unsupported unary operation: {type(node.op)}")
+            elif token == '(':
+                if not expect_operand:
+                    return None
+                operators.append(None)
             
-            return op(operand)
+            elif token == ')':
+                if expect_operand:
+                    return None
+                while operators and operators[-1] is not None:
+                    program.append((operators.pop(), None))
+                if not operators:
+                    return None
+                operators.pop()
+            
+            elif expect_operand:
+                # Prefix operators never pop pending operators when pushed
+                code = _PREFIX_TOKENS.get(token)
+                if code is None:
+                    return None
+                operators.append(code)
+            
+            else:
+                code = _BINARY_TOKENS[token]
+                precedence = _OP_PRECEDENCE[code]
+                right_assoc = code == _OP_POW
+                while operators and operators[-1] is not None:
+                    top_precedence = _OP_PRECEDENCE[operators[-1]]
+                    if top_precedence > precedence or (top_precedence == precedence and not right_assoc):
+                        program.append((operators.pop(), None))
+                    else:
+                        break
+                operators.append(code)
+                expect_operand = True
         
-        else:
+        if expect_operand:
+            return None
+        while operators:
+            code = operators.pop()
+            if code is None:
+                return None
+            program.append((code, None))
+        
+        return program
+    
+    def _run_program(self, program: List[Tuple[int, Any]]) -> Union[int, float]:
+        """Execute a compiled reverse Polish program on a value stack."""
+        values = []
+        for code, value in program:
+            if code == _OP_PUSH:
+                values.append(value)
+            elif code >= _OP_POS:
+                values.append(_OP_FUNCS[code](values.pop()))
+            else:
+                right = values.pop()
+                left = values.pop()
+                
+                if code == _OP_DIV and right == 0:
+                    raise ZeroDivisionError("Division by zero")
+                if code == _OP_MOD and right == 0:
+                    raise ZeroDivisionError("Modulo by zero")
+                
+                # A negative base with a fractional exponent is the only complex-producing case
+                if code == _OP_POW and left < 0 and isinstance(right, float) and not right.is_integer():
+                    raise ValueError("Complex numbers are not supported")
+                
+                values.append(_OP_FUNCS[code](left, right))
+        
+        return values[0]
+
+
+# Node types allowed in a compiled expression, besides the supported operators
+_ALLOWED_NODES = (ast.Expression, ast.Constant, ast.BinOp, ast.UnaryOp)
+
+# Empty builtins so compiled expressions can't reach any names
+_EVAL_GLOBALS = {'__builtins__': {}}
+
+
+def _validate_ast_whitelist(tree: ast.AST) -> None:
+    """
+    Reject any AST containing nodes outside the supported arithmetic subset.
+    
+    Args:
+        tree: Parsed expression tree
+        
+    Raises:
+        ValueError: For unsupported nodes, operators or literal types
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp):
+            if type(node.op) not in _BINARY_OPS:
+                raise ValueError(f"Unsupported binary operation: {type(node.op)}")
+        elif isinstance(node, ast.UnaryOp):
+            if type(node.op) not in _UNARY_OPS:
+                raise ValueError(f"Unsupported unary operation: {type(node.op)}")
+        elif isinstance(node, ast.Constant):
+            if type(node.value) not in (int, float):
+                raise ValueError(f"Unsupported constant: {node.value!r}")
+        elif isinstance(node, (ast.operator, ast.unaryop)):
+            continue  # Operator nodes were checked on their parent
+        elif not isinstance(node, _ALLOWED_NODES):
             raise ValueError(f"Unsupported AST node type: {type(node)}")
 
 
+@functools.lru_cache(maxsize=1024)
+def _compile_expression(expression: str) -> types.CodeType:
+    """Parse, whitelist-check and compile a normalized expression to a code object."""
+    tree = ast.parse(expression, mode='eval')
+    _validate_ast_whitelist(tree)
+    return compile(tree, '<calc>', 'eval')
+
+
+# Shared instance (and result cache) for the API and the convenience function
+DEFAULT_CALCULATOR = CalculatorService()
+
+
 # Convenience function for quick calculations
 def calculate(expression: str) -> Union[int, float]:
     """Quick calculation function for simple use cases."""
-    calculator = CalculatorService()
-    return calculator.evaluate_expression(expression)
+    return DEFAULT_CALCULATOR.evaluate_expression(expression)
 
 
 # Example usage and testing
@@ -0,0 +1,145 @@
+"""
+Sentence Encoder Loading
+========================
+
+Chooses the sentence embedding backend used by the RAG service.
+
+An ONNX export of the sentence transformer (graph-optimized and int8
+quantized, see scripts/export_onnx_encoder.py) is used when its directory
+exists and onnxruntime is installed; otherwise the regular
+SentenceTransformer model is loaded.
+
+Features:
+- SentenceTransformer-compatible encode() over an ONNX Runtime session
+- Mean pooling with the attention mask, optional L2 normalization
+- Transparent fallback to SentenceTransformer
+"""
+
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default location of the exported encoder (overridable per service)
+DEFAULT_ONNX_MODEL_DIR = "models/minilm-onnx"
+
+# all-MiniLM-L6-v2 is trained with inputs of up to 256 word pieces
+MAX_SEQUENCE_LENGTH = 256
+
+
+class ONNXSentenceEncoder:
+    """
+    Sentence encoder running an exported transformer with ONNX Runtime.
+    
+    Mirrors the parts of the SentenceTransformer API used by the services:
+    encode() and get_sentence_embedding_dimension().
+    """
+    
+    def __init__(self, model_dir: str):
+        """
+        Load the ONNX model and tokenizer.
+        
+        Args:
+            model_dir: Directory holding the exported model and tokenizer files
+                       (model_quantized.onnx is preferred over model.onnx)
+        """
+        import onnxruntime
+        from transformers import AutoTokenizer
+        
+        model_path = Path(model_dir) / "model_quantized.onnx"
+        if not model_path.exists():
+            model_path = Path(model_dir) / "model.onnx"
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.model_path = str(model_path)
+        
+        hidden_size = self.session.get_outputs()[0].shape[-1]
+        self.embedding_dim = hidden_size if isinstance(hidden_size, int) else self.encode([""]).shape[1]
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding dimension produced by encode()."""
+        return self.embedding_dim
+    
+    def encode(self, sentences: List[str], convert_to_numpy: bool = True, batch_size: int = 32,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Embed sentences.
+        
+        Args:
+            sentences: Texts to embed
+            convert_to_numpy: Accepted for API compatibility (always returns NumPy)
+            batch_size: Number of sentences per ONNX Runtime call
+            normalize_embeddings: L2-normalize each embedding
+            show_progress_bar: Accepted for API compatibility (ignored)
+        
+        Returns:
+            float32 array of shape (len(sentences), embedding_dim)
+        """
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(
+                sentences[start:start + batch_size], padding=True, truncation=True,
+                max_length=MAX_SEQUENCE_LENGTH, return_tensors="np"
+            )
+            feeds = {name: value.astype(np.int64) for name, value in tokens.items() if name in self.input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+            
+            # Mean pooling over real (non-padding) tokens
+            mask = tokens["attention_mask"][..., np.newaxis].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            batches.append(summed / np.clip(mask.sum(axis=1), 1e-9, None))
+        
+        embeddings = np.concatenate(batches).astype(np.float32, copy=False) if batches \
+            else np.zeros((0, self.embedding_dim), dtype=np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def encoder_identity(encoder, model_name: str) -> str:
+    """
+    Identify the model and backend whose embeddings an encoder produces.
+    
+    Args:
+        encoder: Encoder returned by load_encoder()
+        model_name: Sentence transformer model name it was loaded for
+    
+    Returns:
+        Identity string, e.g. "sentence-transformers:all-MiniLM-L6-v2"
+    """
+    if isinstance(encoder, ONNXSentenceEncoder):
+        return f"onnx:{model_name}:{Path(encoder.model_path).name}"
+    return f"sentence-transformers:{model_name}"
+
+
+def load_encoder(model_name: str, onnx_model_dir: Optional[str] = DEFAULT_ONNX_MODEL_DIR):
+    """
+    Load the fastest available sentence encoder.
+    
+    Args:
+        model_name: Sentence transformer model name (used for the fallback)
+        onnx_model_dir: Directory of an ONNX export of the same model, if any
+    
+    Returns:
+        ONNXSentenceEncoder or SentenceTransformer instance
+    """
+    if onnx_model_dir and Path(onnx_model_dir).is_dir():
+        try:
+            encoder = ONNXSentenceEncoder(onnx_model_dir)
+            logger.info("Using ONNX Runtime encoder from %s", encoder.model_path)
+            return encoder
+        except Exception as e:
+            logger.warning("Could not load ONNX encoder from %s, falling back to %s: %s",
+                           onnx_model_dir, model_name, e)
+    
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
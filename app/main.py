@@ -12,35 +12,101 @@ Endpoints:
 """
 
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from anyio import to_thread
+from pydantic import BaseModel, ConfigDict
 import uvicorn
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Hashable, List, Tuple
+import asyncio
+import json
 import logging
+import os
+from contextlib import asynccontextmanager
 import sys
 from pathlib import Path
 
 # Add chatbot to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from .calculator import CalculatorService
+from .batcher import QueryBatcher
+from .cache import TTLCache
+from .calculator import DEFAULT_CALCULATOR as calculator_service, EXPRESSION_PATTERN, MAX_EXPRESSION_LENGTH
 from .rag_service import create_rag_service
+from .responses import FastJSONResponse, render_json
 from .sql_service import create_sql_service
 from chatbot.planner import PlannerBot
 from chatbot.memory_bot import MemoryBot
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (set LOG_LEVEL=WARNING in production to skip per-request logs)
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
+# Chat sessions are dropped after this long without a message
+SESSION_IDLE_TTL = 1800
+SESSION_CLEANUP_INTERVAL = 900
+MAX_SESSIONS = 1024
+
+# In-memory conversation storage (turn count and memory messages), bounded by LRU
+# eviction and an idle TTL. When REDIS_URL is set the shared copy of each session
+# is kept in Redis so any worker can serve a turn
+conversations = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_IDLE_TTL, sliding=True)
+
+# Worker threads available to blocking handler work (chat turns, searches, queries)
+THREADPOOL_SIZE = 100
+
+# Shared session state store (None when running without Redis)
+SESSION_STATE_TTL = 86400
+redis_client = None
+
+
+async def _purge_idle_sessions():
+    """Periodically drop idle chat sessions that haven't been touched since expiring."""
+    while True:
+        await asyncio.sleep(SESSION_CLEANUP_INTERVAL)
+        removed = conversations.purge_expired()
+        if removed:
+            logger.info("Purged %d idle chat sessions", removed)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background maintenance tasks and the session store client."""
+    global redis_client
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    
+    redis_url = os.environ.get("REDIS_URL")
+    if redis_url:
+        import redis.asyncio as redis_asyncio
+        redis_client = redis_asyncio.from_url(redis_url)
+        logger.info("Storing chat session state in Redis")
+    
+    cleanup_task = asyncio.create_task(_purge_idle_sessions())
+    product_batcher.start()
+    try:
+        yield
+    finally:
+        cleanup_task.cancel()
+        await product_batcher.stop()
+        sql_service.close()
+        if planner_bot.tool_manager is not None:
+            await planner_bot.tool_manager.aclose()
+        if redis_client is not None:
+            await redis_client.aclose()
+            redis_client = None
+
+
 # Create FastAPI application
 app = FastAPI(
     title="Mindhive AI Chatbot API",
     description="API endpoints for calculator, product search, outlet queries, and interactive chat",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware for frontend integration
@@ -52,34 +118,188 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-calculator_service = CalculatorService()
+# Initialize services (the calculator is the shared module-level instance)
 rag_service = create_rag_service()
 sql_service = create_sql_service()
 
-# Initialize chatbot with tool integration
+# Concurrent product searches share one encoder pass and one FAISS search
+product_batcher = QueryBatcher(rag_service.search_products_batch)
+
+# Initialize chatbot with tool integration (shared by all sessions, which pass
+# their own conversation state into each turn)
 planner_bot = PlannerBot(enable_tools=True)
-memory_bot = MemoryBot()
 
-# In-memory conversation storage (for demo purposes)
-# In production, use persistent storage like Redis
-conversations: Dict[str, Dict[str, Any]] = {}
+# Longest natural-language query accepted by /products and /outlets
+MAX_QUERY_LENGTH = 200
+
+# Short-lived caches of rendered response bodies for repeated product and outlet queries
+product_cache = TTLCache(maxsize=512, ttl=300)
+outlet_cache = TTLCache(maxsize=512, ttl=300)
+
+# Rendered calculator responses (a pure function of the expression)
+calculator_cache = TTLCache(maxsize=1024, ttl=3600)
+_cache_locks: Dict[Hashable, List[Any]] = {}
+
+# Turns of one chat session run one at a time
+_session_locks: Dict[Hashable, List[Any]] = {}
 
 
 class ChatMessage(BaseModel):
     """Chat message request model."""
+    model_config = ConfigDict(extra='forbid', frozen=True, str_strip_whitespace=True)
+    
     message: str
     session_id: Optional[str] = "default"
 
 
 class ChatResponse(BaseModel):
     """Chat response model."""
+    model_config = ConfigDict(frozen=True)
+    
     response: str
     session_id: str
     conversation_context: Dict[str, Any]
     planner_decision: Optional[Dict[str, Any]] = None
 
 
+def _session_key(session_id: str) -> str:
+    """Redis key holding a chat session's state."""
+    return f"sess:{session_id}"
+
+
+async def _load_session_state(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a session's shared state from Redis.
+    
+    Args:
+        session_id: Chat session ID
+    
+    Returns:
+        Dictionary with turn_count and memory_messages, or None if unavailable
+    """
+    if redis_client is None:
+        return None
+    try:
+        raw = await redis_client.get(_session_key(session_id))
+    except Exception as e:
+        logger.warning("Session store read failed for %s: %s", session_id, e)
+        return None
+    return json.loads(raw) if raw else None
+
+
+async def _save_session_state(session_id: str, session: Dict[str, Any]):
+    """
+    Persist a session's serializable state to Redis.
+    
+    Args:
+        session_id: Chat session ID
+        session: Session holding the turn count and memory messages
+    """
+    if redis_client is None:
+        return
+    state = {
+        "turn_count": session["turn_count"],
+        "memory_messages": session["messages"]
+    }
+    try:
+        await redis_client.set(_session_key(session_id), json.dumps(state), ex=SESSION_STATE_TTL)
+    except Exception as e:
+        logger.warning("Session store write failed for %s: %s", session_id, e)
+
+
+async def _delete_session_state(session_id: str) -> bool:
+    """
+    Remove a session's shared state from Redis.
+    
+    Args:
+        session_id: Chat session ID
+    
+    Returns:
+        True if a stored session was deleted
+    """
+    if redis_client is None:
+        return False
+    try:
+        return bool(await redis_client.delete(_session_key(session_id)))
+    except Exception as e:
+        logger.warning("Session store delete failed for %s: %s", session_id, e)
+        return False
+
+
+def _create_session(state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a chat session, optionally restored from stored state.
+    
+    Args:
+        state: Shared session state previously saved by another turn
+    
+    Returns:
+        Session dictionary with memory messages and turn count
+    """
+    if state:
+        return {"messages": state["memory_messages"], "turn_count": state["turn_count"]}
+    return {"messages": [], "turn_count": 0}
+
+
+@asynccontextmanager
+async def _keyed_lock(locks: Dict[Hashable, List[Any]], key: Hashable) -> AsyncIterator[None]:
+    """
+    Hold a per-key asyncio lock, discarding it once no task is using it.
+    
+    Args:
+        locks: Registry mapping each key to [lock, number of tasks using it]
+        key: Key to serialize on
+    """
+    entry = locks.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del locks[key]
+
+
+async def _get_or_compute(cache: TTLCache, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                          cacheable: Callable[[Any], bool]) -> Any:
+    """
+    Return a cached result, computing it at most once per key at a time.
+    
+    Args:
+        cache: Cache to read from and populate
+        key: Cache key
+        compute: Zero-argument coroutine function producing the result on a miss
+        cacheable: Predicate deciding whether a computed result may be stored
+        
+    Returns:
+        Cached or freshly computed result
+    """
+    result = cache.get(key)
+    if result is not None:
+        return result
+    
+    # Concurrent misses for the same key wait for the first computation
+    async with _keyed_lock(_cache_locks, (id(cache), key)):
+        result = cache.get(key)
+        if result is None:
+            result = await compute()
+            if cacheable(result):
+                cache.set(key, result)
+    
+    return result
+
+
+def _render_json(content: Any) -> bytes:
+    """Serialize a response body once so cached responses skip re-encoding."""
+    return render_json(content)
+
+
+def _json_response(body: bytes) -> Response:
+    """Wrap a pre-rendered JSON body in a response."""
+    return Response(content=body, media_type="application/json")
+
+
 @app.get("/")
 async def root():
     """
@@ -147,26 +367,24 @@ async def chat(chat_request: ChatMessage) -> ChatResponse:
     """
     try:
         session_id = chat_request.session_id or "default"
-        user_message = chat_request.message.strip()
-        
-        logger.info(f"Chat request: session={session_id}, message='{user_message}'")
-        
-        # Initialize session if new
-        if session_id not in conversations:
-            conversations[session_id] = {
-                "planner": PlannerBot(enable_tools=True),
-                "memory": MemoryBot(),
-                "turn_count": 0
-            }
-        
-        session = conversations[session_id]
-        session["turn_count"] += 1
-        
-        # Get planner decision
-        planner_result = session["planner"].execute_conversation_turn(user_message)
-        
-        # Update memory with the interaction
-        memory_response = session["memory"].chat(user_message)
+        user_message = chat_request.message
+        
+        logger.info("Chat request: session=%s, message=%r", session_id, user_message)
+        
+        async with _keyed_lock(_session_locks, session_id):
+            # Initialize session if new (or evicted), and rebuild it from the shared
+            # store when another worker has served later turns
+            state = await _load_session_state(session_id)
+            session = conversations.get(session_id)
+            if session is None or (state and state["turn_count"] > session["turn_count"]):
+                session = _create_session(state)
+                conversations.set(session_id, session)
+            
+            # Run the blocking planner/tool/memory work off the event loop
+            planner_result = await _run_chat_turn(session, user_message)
+            memory_contents = MemoryBot.format_history(session["messages"])
+            
+            await _save_session_state(session_id, session)
         
         # Prepare response
         bot_response = planner_result.get("response", "I'm not sure how to help with that.")
@@ -174,12 +392,12 @@ async def chat(chat_request: ChatMessage) -> ChatResponse:
         # Get conversation context
         conversation_context = {
             "turn_count": session["turn_count"],
-            "memory_contents": session["memory"].get_memory_contents(),
+            "memory_contents": memory_contents,
             "planner_action": planner_result.get("decision", {}).action.value if planner_result.get("decision") else None,
             "planner_confidence": planner_result.get("decision", {}).confidence if planner_result.get("decision") else None
         }
         
-        logger.info(f"Chat response: session={session_id}, action={conversation_context.get('planner_action')}")
+        logger.info("Chat response: session=%s, action=%s", session_id, conversation_context.get('planner_action'))
         
         return ChatResponse(
             response=bot_response,
@@ -193,30 +411,56 @@ async def chat(chat_request: ChatMessage) -> ChatResponse:
         )
         
     except Exception as e:
-        logger.error(f"Chat error: {e}")
+        logger.error("Chat error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing chat message: {str(e)}"
         )
 
 
+async def _run_chat_turn(session: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """
+    Run one conversation turn for a session with the shared planner.
+    
+    Planning plus the tool call and the memory bot's reply only read the
+    conversation so far, so they run concurrently in the thread pool.
+    
+    Args:
+        session: Session holding the memory messages and turn count
+        user_message: User's message
+        
+    Returns:
+        Planner result with the decision and response
+    """
+    session["turn_count"] += 1
+    messages = session["messages"]
+    
+    planner_result, (_, session["messages"]) = await asyncio.gather(
+        run_in_threadpool(planner_bot.execute_conversation_turn, user_message,
+                          memory_state={"messages": messages}, update_memory=False),
+        run_in_threadpool(planner_bot.memory_bot.respond, messages, user_message)
+    )
+    return planner_result
+
+
 @app.get("/chat/sessions")
 async def get_active_sessions():
     """
-    Get information about active chat sessions.
+    Get information about chat sessions active in this worker.
     
     Returns:
         Dictionary with active session information
     """
+    sessions = conversations.items()
     return {
-        "active_sessions": list(conversations.keys()),
-        "total_sessions": len(conversations),
+        "active_sessions": [session_id for session_id, _ in sessions],
+        "total_sessions": len(sessions),
         "sessions_info": {
             session_id: {
                 "turn_count": session["turn_count"],
-                "memory_length": len(session["memory"].get_memory_contents()),
+                "memory_length": len(MemoryBot.format_history(session["messages"])),
             }
-            for session_id, session in conversations.items()
+            for session_id, session in sessions
         }
     }
 
@@ -232,8 +476,9 @@ async def clear_session(session_id: str):
     Returns:
         Confirmation message
     """
-    if session_id in conversations:
-        del conversations[session_id]
+    removed_local = conversations.pop(session_id) is not None
+    removed_shared = await _delete_session_state(session_id)
+    if removed_local or removed_shared:
         return {"message": f"Session {session_id} cleared successfully"}
     else:
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
@@ -241,7 +486,8 @@ async def clear_session(session_id: str):
 
 @app.get("/calculator")
 async def calculate(
-    expr: str = Query(..., description="Mathematical expression to evaluate", example="2+3*4")
+    expr: str = Query(..., description="Mathematical expression to evaluate", example="2+3*4",
+                      min_length=1, max_length=MAX_EXPRESSION_LENGTH, pattern=EXPRESSION_PATTERN)
 ):
     """
     Calculate mathematical expressions safely.
@@ -258,32 +504,38 @@ async def calculate(
         - /calculator?expr=10/0 → {"error": "Division by zero"}
     """
     try:
-        logger.info(f"Calculator request: expr='{expr}'")
-        
-        # Validate and calculate expression
-        result = calculator_service.evaluate_expression(expr)
-        
-        logger.info(f"Calculator result: {result}")
-        return {
-            "expression": expr,
-            "result": result,
-            "safe": True
-        }
+        logger.debug("Calculator request: expr=%r", expr)
+        
+        # Repeated expressions are served from the cache; failures raise and are not cached
+        body = calculator_cache.get(expr)
+        if body is None:
+            # Validate and calculate expression
+            result = await run_in_threadpool(calculator_service.evaluate_expression, expr)
+            
+            logger.debug("Calculator result: %s", result)
+            body = _render_json({
+                "expression": expr,
+                "result": result,
+                "safe": True
+            })
+            calculator_cache.set(expr, body)
+        
+        return _json_response(body)
         
     except ValueError as e:
-        logger.warning(f"Calculator validation error: {e}")
+        logger.warning("Calculator validation error: %s", e)
         raise HTTPException(
             status_code=400,
             detail=f"Invalid expression: {str(e)}"
         )
     except ZeroDivisionError:
-        logger.warning(f"Calculator division by zero: {expr}")
+        logger.warning("Calculator division by zero: %s", expr)
         raise HTTPException(
             status_code=400,
             detail="Division by zero is not allowed"
         )
     except Exception as e:
-        logger.error(f"Calculator unexpected error: {e}")
+        logger.error("Calculator unexpected error: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error during calculation"
@@ -292,7 +544,8 @@ async def calculate(
 
 @app.get("/products")
 async def search_products(
-    query: str = Query(..., description="Search query for drinkware products", example="black tumbler")
+    query: str = Query(..., description="Search query for drinkware products", example="black tumbler",
+                       min_length=1, max_length=MAX_QUERY_LENGTH)
 ):
     """
     Search drinkware products using RAG (Retrieval-Augmented Generation).
@@ -309,16 +562,20 @@ async def search_products(
         - /products?query=travel bottle
     """
     try:
-        logger.info(f"Product search request: query='{query}'")
+        logger.debug("Product search request: query=%r", query)
         
-        # Get product recommendations using RAG
-        result = rag_service.get_product_recommendations(query)
+        # Get product recommendations using RAG (empty or failed searches are not cached)
+        total_found, body = await _get_or_compute(
+            product_cache, query,
+            lambda: _run_product_search(query),
+            cacheable=lambda value: value[0] > 0
+        )
         
-        logger.info(f"Product search result: {result['total_found']} products found")
-        return result
+        logger.info("Product search result: %d products found", total_found)
+        return _json_response(body)
         
     except Exception as e:
-        logger.error(f"Product search error: {e}")
+        logger.error("Product search error: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error during product search"
@@ -327,7 +584,8 @@ async def search_products(
 
 @app.get("/outlets")
 async def query_outlets(
-    query: str = Query(..., description="Natural language query for outlet information", example="outlets in SS2")
+    query: str = Query(..., description="Natural language query for outlet information", example="outlets in SS2",
+                       min_length=1, max_length=MAX_QUERY_LENGTH)
 ):
     """
     Query outlet information using Text2SQL.
@@ -345,40 +603,56 @@ async def query_outlets(
         - /outlets?query=all outlets
     """
     try:
-        logger.info(f"Outlet query request: query='{query}'")
-        
-        # Process query using Text2SQL
-        result = sql_service.query_outlets(query)
-        
-        # Format for user-friendly response
-        formatted_response = sql_service.format_results_for_user(result)
-        
-        # Return both formatted and raw data
-        response = {
-            "query": query,
-            "sql_generated": result.get('sql_query', ''),
-            "outlets": result.get('results', []),
-            "total_results": result.get('total_results', 0),
-            "formatted_response": formatted_response
-        }
+        logger.info("Outlet query request: query=%r", query)
+        
+        # Process query using Text2SQL and format for user-friendly response
+        # (queries that errored are not cached)
+        result, body = await _get_or_compute(
+            outlet_cache, query,
+            lambda: run_in_threadpool(_run_outlet_query, query),
+            cacheable=lambda value: 'error' not in value[0]
+        )
         
-        logger.info(f"Outlet query result: {result.get('total_results', 0)} outlets found")
-        return response
+        logger.info("Outlet query result: %d outlets found", result.get('total_results', 0))
+        return _json_response(body)
         
     except Exception as e:
-        logger.error(f"Outlet query error: {e}")
+        logger.error("Outlet query error: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error during outlet query"
         )
 
 
+async def _run_product_search(query: str) -> Tuple[int, bytes]:
+    """Search products through the shared batcher and render the summarized results."""
+    products = await product_batcher.submit(query)
+    result = rag_service.build_recommendations(query, products)
+    return result['total_found'], _render_json(result)
+
+
+def _run_outlet_query(query: str) -> Tuple[Dict[str, Any], bytes]:
+    """Run a Text2SQL outlet query and render it with a user-friendly summary."""
+    result = sql_service.query_outlets(query)
+    
+    # Return both formatted and raw data
+    response = {
+        "query": query,
+        "sql_generated": result.get('sql_query', ''),
+        "sql_params": result.get('sql_params', []),
+        "outlets": result.get('results', []),
+        "total_results": result.get('total_results', 0),
+        "formatted_response": sql_service.format_results_for_user(result)
+    }
+    return result, _render_json(response)
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """
     Custom exception handler for consistent error responses.
     """
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
@@ -388,13 +662,28 @@ async def http_exception_handler(request, exc):
     )
 
 
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request, exc):
+    """
+    Report query-parameter validation failures in the same error format.
+    """
+    return FastJSONResponse(
+        status_code=422,
+        content={
+            "error": "; ".join(error["msg"] for error in exc.errors()),
+            "status_code": 422,
+            "path": str(request.url.path)
+        }
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """
     General exception handler for unexpected errors.
     """
-    logger.error(f"Unexpected error: {exc}")
-    return JSONResponse(
+    logger.error("Unexpected error: %s", exc)
+    return FastJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -404,14 +693,22 @@ async def general_exception_handler(request, exc):
     )
 
 
-# Development server
+# Server entry point (set ENV=dev for auto-reload)
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 8000))
+    dev_mode = os.environ.get("ENV") == "dev"
+    
+    # Without REDIS_URL chat sessions live in process memory, so extra workers
+    # need sticky routing
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
+        reload=dev_mode,
+        workers=1 if dev_mode else workers,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     ) 
\ No newline at end of file
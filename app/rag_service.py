@@ -7,25 +7,48 @@ Uses FAISS vector store for efficient similarity search and generates
 AI-powered summaries of relevant products.
 
 Features:
-- FAISS vector store with sentence transformers
+- FAISS HNSW vector store with int8-quantized embeddings
+- Sentence transformer encoder, run through ONNX Runtime when exported
 - Product embedding and indexing
 - Top-k retrieval with similarity scoring
+- Exact and semantic query caches that skip repeated encoder/index work
 - AI-generated summaries of search results
 """
 
 import json
 import logging
+import os
+import pickle
+import time
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import numpy as np
 
 # Vector store and embeddings
 import faiss
-from sentence_transformers import SentenceTransformer
+
+from .encoder import DEFAULT_ONNX_MODEL_DIR, encoder_identity, load_encoder
+from .cache import SemanticCache, TTLCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# HNSW graph parameters: neighbours per node and build/query beam widths
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 32
+
+# Flat index shipped before the HNSW index, served until the new one is built
+# (only to the encoder that produced it)
+LEGACY_INDEX_FILE = "data/product_index.faiss"
+LEGACY_INDEX_ENCODER = "sentence-transformers:all-MiniLM-L6-v2"
+
+# Query caches: exact query text, then near-identical query embeddings
+QUERY_CACHE_SIZE = 2048
+QUERY_CACHE_TTL = 3600
+SEMANTIC_CACHE_THRESHOLD = 0.97
+
 
 class ProductRAGService:
     """
@@ -38,7 +61,9 @@ class ProductRAGService:
     def __init__(self, 
                  products_file: str = "data/zus_products.json",
                  model_name: str = "all-MiniLM-L6-v2",
-                 index_file: str = "data/product_index.faiss"):
+                 index_file: str = "data/product_index_hnsw_sq8.faiss",
+                 onnx_model_dir: Optional[str] = DEFAULT_ONNX_MODEL_DIR,
+                 legacy_index_file: Optional[str] = LEGACY_INDEX_FILE):
         """
         Initialize RAG service.
         
@@ -46,44 +71,128 @@ class ProductRAGService:
             products_file: Path to products JSON file
             model_name: Sentence transformer model name
             index_file: Path to FAISS index file
+            onnx_model_dir: Directory of an ONNX export of the model, used if present
+            legacy_index_file: Flat index used while index_file has not been built
         """
         self.products_file = products_file
         self.model_name = model_name
         self.index_file = index_file
+        self.legacy_index_file = legacy_index_file
         
-        # Initialize sentence transformer
-        self.encoder = SentenceTransformer(model_name)
+        # Binary sidecars written with the index: parsed products, their
+        # embeddings and the identity of the encoder that produced them
+        self.products_cache_file = products_cache_path(products_file)
+        self.embeddings_file = embeddings_path(index_file)
+        self.encoder_file = encoder_metadata_path(index_file)
+        
+        # Initialize sentence encoder (ONNX Runtime export if available)
+        self.encoder = load_encoder(model_name, onnx_model_dir)
+        self.encoder_id = encoder_identity(self.encoder, model_name)
         self.embedding_dim = self.encoder.get_sentence_embedding_dimension()
         
         # Storage for products and embeddings
         self.products: List[Dict[str, Any]] = []
-        self.index: Optional[faiss.IndexFlatIP] = None
+        self.index: Optional[faiss.Index] = None
+        
+        # Pre-rendered summary lines keyed by (name, price, description)
+        self._summary_lines: Dict[tuple, str] = {}
+        
+        # Search result caches (exact text → results, similar embedding → results)
+        self.query_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+        self.semantic_cache = SemanticCache(self.embedding_dim, maxsize=QUERY_CACHE_SIZE,
+                                            threshold=SEMANTIC_CACHE_THRESHOLD)
+        
+        # Last formatted timestamp as (epoch second, text)
+        self._timestamp_cache = (0, '')
         
         # Load products and build index
         self._load_products()
         self._build_or_load_index()
     
     def _load_products(self):
-        """Load products from JSON file."""
+        """Load products from the pickle sidecar, or from the JSON file if it is stale."""
         try:
-            if Path(self.products_file).exists():
+            if self._is_fresh(self.products_cache_file):
+                with open(self.products_cache_file, 'rb') as f:
+                    self.products = pickle.load(f)
+                source = self.products_cache_file
+            elif Path(self.products_file).exists():
                 with open(self.products_file, 'r', encoding='utf-8') as f:
                     self.products = json.load(f)
-                logger.info(f"Loaded {len(self.products)} products from {self.products_file}")
+                source = self.products_file
             else:
-                logger.warning(f"Products file not found: {self.products_file}")
+                logger.warning("Products file not found: %s", self.products_file)
                 self.products = []
+                return
+            
+            # The catalog is static, so render each product's summary line once
+            self._summary_lines = {
+                self._summary_key(product): self._format_summary_line(product)
+                for product in self.products
+            }
+            logger.info("Loaded %d products from %s", len(self.products), source)
         except Exception as e:
-            logger.error(f"Error loading products: {e}")
+            logger.error("Error loading products: %s", e)
             self.products = []
     
+    def _is_fresh(self, sidecar_file: str) -> bool:
+        """
+        Check whether a sidecar was written after the products JSON last changed.
+        
+        Args:
+            sidecar_file: Path to a file derived from the products JSON
+        
+        Returns:
+            True if the sidecar exists and is not older than the JSON file
+        """
+        sidecar = Path(sidecar_file)
+        if not sidecar.exists():
+            return False
+        source = Path(self.products_file)
+        return not source.exists() or sidecar.stat().st_mtime >= source.stat().st_mtime
+    
+    def _load_embeddings(self) -> Optional[np.ndarray]:
+        """
+        Memory-map previously computed product embeddings, if still valid.
+        
+        Returns:
+            Read-only embeddings array, or None if missing, stale or mismatched
+        """
+        if not self._is_fresh(self.embeddings_file) or not self._built_by_current_encoder():
+            return None
+        try:
+            embeddings = np.load(self.embeddings_file, mmap_mode='r')
+        except Exception as e:
+            logger.warning("Could not load embeddings from %s: %s", self.embeddings_file, e)
+            return None
+        if embeddings.shape != (len(self.products), self.embedding_dim) or embeddings.dtype != np.float32:
+            return None
+        return embeddings
+    
+    def _built_by_current_encoder(self) -> bool:
+        """
+        Check whether the saved index and embeddings came from this service's encoder.
+        
+        Returns:
+            True if the recorded encoder identity matches the loaded encoder
+        """
+        try:
+            with open(self.encoder_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('encoder') == self.encoder_id
+        except (OSError, ValueError):
+            return False
+    
     def _build_or_load_index(self):
         """Build or load FAISS index for products."""
         try:
-            # Try to load existing index
-            if Path(self.index_file).exists():
-                self.index = faiss.read_index(self.index_file)
-                logger.info(f"Loaded existing FAISS index from {self.index_file}")
+            # Try to load existing index, memory-mapped read-only so every worker
+            # shares the OS page cache instead of holding its own heap copy.
+            # Build the index (scripts/build_vector_index.py) before starting
+            # several workers so they all map the same finished file.
+            if Path(self.index_file).exists() and self._built_by_current_encoder():
+                self.index = faiss.read_index(self.index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                self._configure_search()
+                logger.info("Loaded existing FAISS index from %s", self.index_file)
                 return
             
             # Build new index if products available
@@ -91,46 +200,89 @@ class ProductRAGService:
                 logger.warning("No products available to build index")
                 return
             
+            # Without saved embeddings to rebuild from, serve the previously
+            # shipped flat index rather than encoding the whole catalog at startup
+            if self._load_embeddings() is None and self._load_legacy_index():
+                return
+            
             logger.info("Building new FAISS index...")
             self._build_index()
             
         except Exception as e:
-            logger.error(f"Error building/loading index: {e}")
+            logger.error("Error building/loading index: %s", e)
             self.index = None
     
+    def _load_legacy_index(self) -> bool:
+        """
+        Load the flat index shipped before the HNSW index, if it matches the catalog.
+        
+        Returns:
+            True if the legacy index was loaded
+        """
+        if self.encoder_id != LEGACY_INDEX_ENCODER:
+            return False
+        if not self.legacy_index_file or not Path(self.legacy_index_file).exists():
+            return False
+        try:
+            index = faiss.read_index(self.legacy_index_file)
+        except Exception as e:
+            logger.warning("Could not load legacy FAISS index from %s: %s", self.legacy_index_file, e)
+            return False
+        if index.ntotal != len(self.products) or index.d != self.embedding_dim:
+            return False
+        
+        self.index = index
+        logger.warning("Serving legacy flat FAISS index from %s; run scripts/build_vector_index.py "
+                       "to build %s", self.legacy_index_file, self.index_file)
+        return True
+    
     def _build_index(self):
         """Build FAISS index from products."""
         try:
-            # Create product texts for embedding
-            product_texts = []
-            for product in self.products:
-                # Combine name, description, and price for rich context
-                text = f"{product['name']} {product['description']} {product['price']}"
-                product_texts.append(text)
-            
-            # Generate embeddings
-            logger.info("Generating embeddings for products...")
-            embeddings = self.encoder.encode(product_texts, convert_to_numpy=True)
-            
-            # Create FAISS index (Inner Product for cosine similarity)
-            self.index = faiss.IndexFlatIP(self.embedding_dim)
+            # Reuse embeddings saved by a previous build of the same catalog
+            embeddings = self._load_embeddings()
+            if embeddings is not None:
+                logger.info("Loaded product embeddings from %s", self.embeddings_file)
+            else:
+                # Create product texts for embedding
+                # (combine name, description, and price for rich context)
+                product_fields = itemgetter('name', 'description', 'price')
+                product_texts = [f"{name} {description} {price}"
+                                 for name, description, price in map(product_fields, self.products)]
+                
+                # Generate embeddings, normalized by the encoder for cosine similarity
+                logger.info("Generating embeddings for products...")
+                embeddings = self.encoder.encode(
+                    product_texts, convert_to_numpy=True, batch_size=64,
+                    normalize_embeddings=True, show_progress_bar=False
+                ).astype(np.float32, copy=False)
             
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings)
+            # Create HNSW graph index over 8-bit scalar-quantized vectors
+            # (Inner Product for cosine similarity)
+            self.index = faiss.IndexHNSWSQ(self.embedding_dim, faiss.ScalarQuantizer.QT_8bit,
+                                           HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            self.index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
             
-            # Add embeddings to index
-            self.index.add(embeddings.astype(np.float32))
+            # Train the per-dimension quantizer ranges, then add embeddings to index
+            self.index.train(embeddings)
+            self.index.add(embeddings)
+            self._configure_search()
             
-            # Save index
-            Path(self.index_file).parent.mkdir(parents=True, exist_ok=True)
-            faiss.write_index(self.index, self.index_file)
+            # Save index, embeddings and the parsed catalog for the next start
+            save_index_artifacts(self.index, self.products, embeddings, self.encoder_id,
+                                 self.index_file, self.products_file)
             
-            logger.info(f"Built and saved FAISS index with {len(self.products)} products")
+            logger.info("Built and saved FAISS index with %d products", len(self.products))
             
         except Exception as e:
-            logger.error(f"Error building index: {e}")
+            logger.error("Error building index: %s", e)
             self.index = None
     
+    def _configure_search(self):
+        """Apply query-time search parameters to the loaded index."""
+        if hasattr(self.index, 'hnsw'):
+            self.index.hnsw.efSearch = HNSW_EF_SEARCH
+    
     def search_products(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """
         Search for products using semantic similarity.
@@ -142,33 +294,97 @@ class ProductRAGService:
         Returns:
             List of product dictionaries with similarity scores
         """
+        results = self.search_products_batch([query], top_k)[0]
+        logger.debug("Found %d products for query: '%s'", len(results), query)
+        return results
+    
+    def search_products_batch(self, queries: List[str], top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries with one encoder pass and one index search.
+        
+        Queries seen before (verbatim or with a near-identical embedding) are
+        answered from the caches without searching the index.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of top results to return per query
+            
+        Returns:
+            List of result lists, one per query in the same order
+        """
         try:
             if not self.index or not self.products:
                 logger.warning("Index or products not available")
-                return []
+                return [[] for _ in queries]
             
-            # Generate query embedding
-            query_embedding = self.encoder.encode([query], convert_to_numpy=True)
-            faiss.normalize_L2(query_embedding)
-            
-            # Search index
-            scores, indices = self.index.search(query_embedding.astype(np.float32), top_k)
+            batch_results: List[Optional[List[Dict[str, Any]]]] = [
+                self.query_cache.get((query, top_k)) for query in queries
+            ]
+            misses = [i for i, results in enumerate(batch_results) if results is None]
             
-            # Prepare results
-            results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.products):
-                    product = self.products[idx].copy()
-                    product['similarity_score'] = float(score)
-                    product['rank'] = i + 1
-                    results.append(product)
+            if misses:
+                # Generate all missing query embeddings in a single encoder call
+                query_embeddings = self.encoder.encode(
+                    [queries[i] for i in misses], convert_to_numpy=True, batch_size=32,
+                    normalize_embeddings=True, show_progress_bar=False
+                ).astype(np.float32, copy=False)
+                
+                to_search = []
+                for row, i in enumerate(misses):
+                    batch_results[i] = self.semantic_cache.get(query_embeddings[row], tag=top_k)
+                    if batch_results[i] is None:
+                        to_search.append(row)
+                
+                if to_search:
+                    # Search index once for the remaining queries (the encoder output is
+                    # already contiguous float32, so only a partial batch needs a gather)
+                    search_embeddings = (query_embeddings if len(to_search) == len(misses)
+                                         else query_embeddings[to_search])
+                    scores, indices = self.index.search(search_embeddings, top_k)
+                    for row, row_scores, row_indices in zip(to_search, scores, indices):
+                        results = self._collect_results(row_scores, row_indices)
+                        self.semantic_cache.set(query_embeddings[row], results, tag=top_k)
+                        batch_results[misses[row]] = results
+                    logger.info("Searched %d product queries in one batch", len(to_search))
+                
+                for i in misses:
+                    self.query_cache.set((queries[i], top_k), batch_results[i])
             
-            logger.info(f"Found {len(results)} products for query: '{query}'")
-            return results
+            # Hand out copies so callers cannot modify cached results
+            return [[product.copy() for product in results] for results in batch_results]
             
         except Exception as e:
-            logger.error(f"Error searching products: {e}")
-            return []
+            logger.error("Error searching product batch: %s", e)
+            return [[] for _ in queries]
+    
+    def _collect_results(self, scores: np.ndarray, indices: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Turn one row of FAISS search output into ranked product dictionaries.
+        
+        Only the user-facing product fields are included; scrape metadata
+        stays in the catalog.
+        
+        Args:
+            scores: Similarity scores for one query
+            indices: Product indices for one query (-1 where fewer hits exist)
+            
+        Returns:
+            List of product dictionaries with similarity scores
+        """
+        valid = (indices >= 0) & (indices < len(self.products))
+        results = []
+        for rank, score, idx in zip(np.flatnonzero(valid) + 1, scores[valid].tolist(), indices[valid].tolist()):
+            product = self.products[idx]
+            results.append({
+                'name': product['name'],
+                'description': product['description'],
+                'price': product['price'],
+                'category': product.get('category'),
+                'link': product.get('link'),
+                'similarity_score': score,
+                'rank': int(rank)
+            })
+        return results
     
     def generate_summary(self, query: str, products: List[Dict[str, Any]]) -> str:
         """
@@ -191,18 +407,11 @@ class ProductRAGService:
             ]
             
             for i, product in enumerate(products, 1):
-                price = product.get('price', 'Price not available')
-                name = product.get('name', 'Unknown product')
-                description = product.get('description', '')
-                
-                # Create product summary
-                product_summary = f"\n{i}. **{name}** - {price}"
-                if description:
-                    # Truncate long descriptions
-                    desc_preview = description[:100] + "..." if len(description) > 100 else description
-                    product_summary += f"\n   {desc_preview}"
-                
-                summary_parts.append(product_summary)
+                # Create product summary (pre-rendered for catalog products)
+                product_summary = self._summary_lines.get(self._summary_key(product))
+                if product_summary is None:
+                    product_summary = self._format_summary_line(product)
+                summary_parts.append(f"\n{i}. {product_summary}")
             
             # Add recommendation
             if len(products) == 1:
@@ -213,9 +422,36 @@ class ProductRAGService:
             return "\n".join(summary_parts)
             
         except Exception as e:
-            logger.error(f"Error generating summary: {e}")
+            logger.error("Error generating summary: %s", e)
             return f"I found some products for '{query}', but encountered an error generating the summary. Please try again."
     
+    @staticmethod
+    def _summary_key(product: Dict[str, Any]) -> tuple:
+        """Key identifying the fields a product's summary line is rendered from."""
+        return (product.get('name'), product.get('price'), product.get('description'))
+    
+    @staticmethod
+    def _format_summary_line(product: Dict[str, Any]) -> str:
+        """
+        Render a product's summary line (without its list number).
+        
+        Args:
+            product: Product dictionary
+            
+        Returns:
+            Name and price, followed by a truncated description if present
+        """
+        price = product.get('price', 'Price not available')
+        name = product.get('name', 'Unknown product')
+        description = product.get('description', '')
+        
+        line = f"**{name}** - {price}"
+        if description:
+            # Truncate long descriptions
+            desc_preview = description[:100] + "..." if len(description) > 100 else description
+            line += f"\n   {desc_preview}"
+        return line
+    
     def get_product_recommendations(self, query: str, top_k: int = 3) -> Dict[str, Any]:
         """
         Get product recommendations with AI-generated summary.
@@ -230,20 +466,10 @@ class ProductRAGService:
         try:
             # Search for products
             products = self.search_products(query, top_k)
-            
-            # Generate summary
-            summary = self.generate_summary(query, products)
-            
-            return {
-                'query': query,
-                'summary': summary,
-                'products': products,
-                'total_found': len(products),
-                'timestamp': self._get_timestamp()
-            }
+            return self.build_recommendations(query, products)
             
         except Exception as e:
-            logger.error(f"Error getting recommendations: {e}")
+            logger.error("Error getting recommendations: %s", e)
             return {
                 'query': query,
                 'summary': f"Sorry, I encountered an error while searching for '{query}'. Please try again.",
@@ -252,10 +478,33 @@ class ProductRAGService:
                 'timestamp': self._get_timestamp()
             }
     
+    def build_recommendations(self, query: str, products: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Package search results with an AI-generated summary.
+        
+        Args:
+            query: Original search query
+            products: Products found for the query
+            
+        Returns:
+            Dictionary with products and summary
+        """
+        return {
+            'query': query,
+            'summary': self.generate_summary(query, products),
+            'products': products,
+            'total_found': len(products),
+            'timestamp': self._get_timestamp()
+        }
+    
     def _get_timestamp(self) -> str:
-        """Get current timestamp."""
-        import time
-        return time.strftime('%Y-%m-%d %H:%M:%S')
+        """Get current timestamp (formatted at most once per second)."""
+        second = int(time.time())
+        cached_second, text = self._timestamp_cache
+        if second != cached_second:
+            text = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+            self._timestamp_cache = (second, text)
+        return text
     
     def get_service_status(self) -> Dict[str, Any]:
         """
@@ -270,10 +519,65 @@ class ProductRAGService:
             'products_loaded': len(self.products),
             'index_available': self.index is not None,
             'model': self.model_name,
+            'encoder_backend': type(self.encoder).__name__,
             'embedding_dim': self.embedding_dim
         }
 
 
+def products_cache_path(products_file: str) -> str:
+    """Path of the pickled catalog written next to the products JSON."""
+    return str(Path(products_file).with_suffix(".pkl"))
+
+
+def embeddings_path(index_file: str) -> str:
+    """Path of the product embeddings written next to the index."""
+    return f"{os.path.splitext(index_file)[0]}.embeddings.npy"
+
+
+def encoder_metadata_path(index_file: str) -> str:
+    """Path of the encoder identity recorded for the index and its embeddings."""
+    return f"{os.path.splitext(index_file)[0]}.encoder.json"
+
+
+def _write_atomic(path: str, write) -> None:
+    """
+    Write a file aside and rename it into place.
+    
+    Concurrently starting workers never read a partially written file.
+    
+    Args:
+        path: Destination path
+        write: Callable writing the contents to a binary file object
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        write(f)
+    os.replace(tmp_file, path)
+
+
+def save_index_artifacts(index: faiss.Index, products: List[Dict[str, Any]], embeddings: np.ndarray,
+                         encoder_id: str, index_file: str, products_file: str) -> None:
+    """
+    Save an index with the sidecars ProductRAGService loads on start.
+    
+    Args:
+        index: Built FAISS index
+        products: Catalog the index was built from
+        embeddings: Normalized float32 product embeddings
+        encoder_id: encoder_identity() of the encoder that produced them
+        index_file: Index path
+        products_file: Products JSON path
+    """
+    # The encoder identity is written last, after everything it vouches for
+    _write_atomic(index_file, lambda f: f.write(faiss.serialize_index(index)))
+    _write_atomic(embeddings_path(index_file), lambda f: np.save(f, embeddings))
+    _write_atomic(products_cache_path(products_file),
+                  lambda f: pickle.dump(products, f, protocol=pickle.HIGHEST_PROTOCOL))
+    _write_atomic(encoder_metadata_path(index_file),
+                  lambda f: f.write(json.dumps({'encoder': encoder_id}).encode('utf-8')))
+
+
 def create_rag_service() -> ProductRAGService:
     """
     Factory function to create RAG service.
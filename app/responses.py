@@ -0,0 +1,58 @@
+"""
+JSON Responses
+==============
+
+JSON rendering shared by the API endpoints.
+
+orjson encodes responses several times faster than the json module, but it
+rejects integers wider than 64 bits, which the calculator returns for
+expressions like 2**64. Those bodies are encoded with the json module
+instead, so every valid result still renders exactly.
+"""
+
+import json
+import logging
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse that falls back to the json module for content orjson rejects."""
+    
+    def render(self, content: Any) -> bytes:
+        try:
+            return super().render(content)
+        except TypeError as e:
+            # orjson.JSONEncodeError (a TypeError), e.g. an int beyond 64 bits
+            logger.debug("Rendering response with json: %s", e)
+            return JSONResponse.render(self, content)
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Serialize a response body, accepting numpy values and ints of any width.
+    
+    Args:
+        content: JSON-compatible content (numpy arrays and scalars allowed)
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    try:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    except TypeError as e:
+        logger.debug("Rendering body with json: %s", e)
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_numpy_to_builtin
+        ).encode("utf-8")
+
+
+def _numpy_to_builtin(value: Any) -> Any:
+    """Convert numpy arrays and scalars for the json module."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
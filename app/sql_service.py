@@ -8,20 +8,76 @@ the SQLite outlets database.
 
 Features:
 - Natural language to SQL translation
-- SQLite database integration
+- SQLite database integration over one shared, read-only tuned connection
 - Query validation and sanitization
 - Structured result formatting
+- Cached results for repeated queries
 """
 
+import functools
 import sqlite3
 import logging
+import os
 import re
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+from .cache import TTLCache
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Settings applied once to the shared connection: in-memory temp tables,
+# a 64 MB page cache, memory-mapped reads, and no writes
+SQLITE_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA query_only=ON",
+)
+
+# Keywords and tokens rejected anywhere in a query, matched case-insensitively
+# as substrings ('exec' also covers 'execute')
+_DANGEROUS_SQL_RE = re.compile(r'drop|delete|insert|update|alter|create|truncate|exec|union|--|;', re.IGNORECASE)
+
+# Case-sensitive twin for lowercased ASCII queries, where lowering is exact
+# and spares the regex engine per-character case folding (several times faster)
+_DANGEROUS_SQL_LOWER_RE = re.compile(_DANGEROUS_SQL_RE.pattern)
+
+# Substring search over area, address and name; also answered from memory.
+# LIKE already ignores ASCII case, so templates never wrap columns in LOWER()
+LOCATION_SEARCH_SQL = "SELECT * FROM outlets WHERE area LIKE ? OR address LIKE ? OR name LIKE ?"
+
+# SQLite's LIKE only folds ASCII letters
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def _ascii_lower(text: str) -> str:
+    """Lowercase ASCII letters only, like SQLite's LIKE."""
+    # str.lower() is exact (and far faster than translate) on ASCII text
+    return text.lower() if text.isascii() else text.translate(_ASCII_LOWER)
+
+
+# Results of recent queries, keyed by normalized query text
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = 300
+
+# Rows pulled from SQLite per fetchmany() call
+FETCH_BATCH_SIZE = 64
+
+# Location keywords that make an unmatched query a location search; the
+# outlets' areas and names are added from the database
+LOCATION_KEYWORDS = ('ss2', 'petaling', 'jaya', 'damansara', 'klcc', 'mont', 'kiara')
+
+# Brand prefix dropped from outlet names to get their location part
+OUTLET_NAME_PREFIX = 'zus coffee '
+
+# Distinct outlet entries whose listing text is kept (outlet data rarely changes)
+LISTING_CACHE_SIZE = 1024
+
 
 class OutletSQLService:
     """
@@ -40,6 +96,23 @@ class OutletSQLService:
         """
         self.db_file = db_file
         
+        # One connection reused by every query (opened on first use), serialized
+        # because handlers run in the thread pool
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        
+        # (sql, params, description, rows) per normalized query; the database is
+        # read-only here, and entries expire so a re-scraped database shows up
+        self._result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        
+        # (database mtime, [(row, area, address, name)]) with ASCII-lowered fields
+        self._outlet_snapshot: Optional[Tuple[int, List[Tuple[Dict[str, Any], ...]]]] = None
+        
+        # Outlet count (set by validation, see refresh_outlet_count) and the
+        # last formatted timestamp
+        self._outlet_count: Optional[int] = None
+        self._timestamp_cache = (0, '')
+        
         # Database schema information
         self.schema_info = {
             'outlets': {
@@ -48,81 +121,208 @@ class OutletSQLService:
             }
         }
         
-        # Common query patterns and their SQL translations
+        self._database_schema = {
+            'database': self.db_file,
+            'tables': self.schema_info,
+            'sample_queries': [
+                "outlets in Petaling Jaya",
+                "opening hours SS2",
+                "phone number KLCC",
+                "all outlets",
+                "count outlets"
+            ]
+        }
+        
+        # Common query patterns and their SQL translations, plus their union
+        # (tried in one regex search, keeping the list order as priority)
         self.query_patterns = self._initialize_query_patterns()
+        self._pattern_union, self._pattern_targets = self._build_pattern_union(self.query_patterns)
+        self._pattern_keywords = tuple(dict.fromkeys(p['keyword'] for p in self.query_patterns))
         
         # Validate database connection
         self._validate_database()
+        
+        # Known location terms, found (and extracted) from a query in one search
+        self._location_matcher = self._build_location_matcher()
     
     def _initialize_query_patterns(self) -> List[Dict[str, Any]]:
         """
         Initialize common query patterns for Text2SQL translation.
         
         Returns:
-            List of query pattern dictionaries
+            List of query pattern dictionaries (patterns compiled once here),
+            each with a literal keyword that any query it matches contains
         """
         return [
             {
-                'pattern': r'outlets?\s+in\s+(.+)',
-                'sql_template': "SELECT * FROM outlets WHERE LOWER(area) LIKE LOWER('%{location}%') OR LOWER(address) LIKE LOWER('%{location}%') OR LOWER(name) LIKE LOWER('%{location}%')",
+                'pattern': re.compile(r'outlets?\s+in\s+(.+)'),
+                'keyword': 'outlet',
+                'sql_template': LOCATION_SEARCH_SQL,
                 'description': 'Find outlets in a specific location'
             },
             {
-                'pattern': r'opening\s+hours?\s+(.+)',
-                'sql_template': "SELECT name, hours, address FROM outlets WHERE LOWER(name) LIKE LOWER('%{location}%') OR LOWER(area) LIKE LOWER('%{location}%')",
+                'pattern': re.compile(r'opening\s+hours?\s+(.+)'),
+                'keyword': 'opening',
+                'sql_template': "SELECT name, hours, address FROM outlets WHERE name LIKE ? OR area LIKE ?",
                 'description': 'Get opening hours for outlets'
             },
             {
-                'pattern': r'phone\s+number\s+(.+)',
-                'sql_template': "SELECT name, phone, address FROM outlets WHERE name LIKE '%{location}%' OR area LIKE '%{location}%'",
+                'pattern': re.compile(r'phone\s+number\s+(.+)'),
+                'keyword': 'phone',
+                'sql_template': "SELECT name, phone, address FROM outlets WHERE name LIKE ? OR area LIKE ?",
                 'description': 'Get phone numbers for outlets'
             },
             {
-                'pattern': r'address\s+(.+)',
-                'sql_template': "SELECT name, address FROM outlets WHERE name LIKE '%{location}%' OR area LIKE '%{location}%'",
+                'pattern': re.compile(r'address\s+(.+)'),
+                'keyword': 'address',
+                'sql_template': "SELECT name, address FROM outlets WHERE name LIKE ? OR area LIKE ?",
                 'description': 'Get addresses for outlets'
             },
             {
-                'pattern': r'services?\s+(.+)',
-                'sql_template': "SELECT name, services, address FROM outlets WHERE name LIKE '%{location}%' OR area LIKE '%{location}%'",
+                'pattern': re.compile(r'services?\s+(.+)'),
+                'keyword': 'service',
+                'sql_template': "SELECT name, services, address FROM outlets WHERE name LIKE ? OR area LIKE ?",
                 'description': 'Get services for outlets'
             },
             {
-                'pattern': r'all\s+outlets?',
+                'pattern': re.compile(r'all\s+outlets?'),
+                'keyword': 'outlet',
                 'sql_template': "SELECT name, area, address FROM outlets ORDER BY area, name",
                 'description': 'List all outlets'
             },
             {
-                'pattern': r'count\s+outlets?',
+                'pattern': re.compile(r'count\s+outlets?'),
+                'keyword': 'outlet',
                 'sql_template': "SELECT COUNT(*) as total_outlets FROM outlets",
                 'description': 'Count total outlets'
             },
             {
-                'pattern': r'(.+)\s+outlet',
-                'sql_template': "SELECT * FROM outlets WHERE name LIKE '%{location}%' OR area LIKE '%{location}%'",
+                'pattern': re.compile(r'(.+)\s+outlet'),
+                'keyword': 'outlet',
+                'sql_template': "SELECT * FROM outlets WHERE name LIKE ? OR area LIKE ?",
                 'description': 'Find specific outlet'
             }
         ]
     
+    @staticmethod
+    def _build_pattern_union(query_patterns: List[Dict[str, Any]]) -> Tuple["re.Pattern[str]", Dict[str, Tuple[Optional[int], Dict[str, Any]]]]:
+        """
+        Fuse the query patterns into one regex with a named group per pattern.
+        
+        Each alternative carries its own lazy prefix under a start anchor, so
+        an earlier pattern matching anywhere in the query still wins over a
+        later pattern matching further left, as with trying them in order.
+        
+        Args:
+            query_patterns: Query pattern dictionaries with compiled patterns
+            
+        Returns:
+            Tuple of (union regex, {group name: (capture group index or None, pattern info)})
+        """
+        alternatives = [
+            f"(?s:.*?)(?P<p{position}>{pattern_info['pattern'].pattern})"
+            for position, pattern_info in enumerate(query_patterns)
+        ]
+        union = re.compile(f"^(?:{'|'.join(alternatives)})")
+        
+        targets = {}
+        for position, pattern_info in enumerate(query_patterns):
+            name = f"p{position}"
+            capture = union.groupindex[name] + 1 if pattern_info['pattern'].groups else None
+            targets[name] = (capture, pattern_info)
+        return union, targets
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Return the shared connection, opening and tuning it if needed.
+        
+        Returns:
+            SQLite connection with rows accessible by column name
+            
+        Raises:
+            FileNotFoundError: If the database file does not exist
+        """
+        if self._conn is None:
+            # sqlite3.connect would silently create an empty database
+            if not Path(self.db_file).exists():
+                raise FileNotFoundError(f"Database file not found: {self.db_file}")
+            
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row  # Enable column access by name
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+            self._conn = conn
+        return self._conn
+    
+    @contextmanager
+    def _cursor(self):
+        """Yield a cursor on the shared connection while holding its lock."""
+        with self._conn_lock:
+            cursor = self._connect().cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+    
+    def close(self):
+        """Close the shared connection (it is reopened on the next query)."""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _build_location_matcher(self) -> "re.Pattern[str]":
+        """
+        Compile the known location terms into one regex.
+        
+        Terms are tried longest first, so the longest term starting at the
+        leftmost match wins (e.g. 'petaling jaya' over 'petaling').
+        
+        Returns:
+            Compiled regex matching any known location term
+        """
+        terms = set(LOCATION_KEYWORDS)
+        try:
+            for row in self._fetch("SELECT DISTINCT area, name FROM outlets"):
+                if row['area']:
+                    terms.add(row['area'].lower().strip())
+                if row['name']:
+                    name = row['name'].lower().strip()
+                    terms.add(name[len(OUTLET_NAME_PREFIX):] if name.startswith(OUTLET_NAME_PREFIX) else name)
+        except Exception as e:
+            logger.warning("Using built-in location keywords only: %s", e)
+        
+        terms.discard('')
+        return re.compile('|'.join(re.escape(term) for term in sorted(terms, key=lambda term: (-len(term), term))))
+    
     def _validate_database(self):
         """Validate database connection and schema."""
         try:
             if not Path(self.db_file).exists():
-                logger.error(f"Database file not found: {self.db_file}")
+                logger.error("Database file not found: %s", self.db_file)
                 return False
             
-            with sqlite3.connect(self.db_file) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM outlets")
-                count = cursor.fetchone()[0]
-                logger.info(f"Database validated: {count} outlets available")
-                return True
-                
+            count = self.refresh_outlet_count()
+            logger.info("Database validated: %s outlets available", count)
+            return True
+            
         except Exception as e:
-            logger.error(f"Database validation failed: {e}")
+            logger.error("Database validation failed: %s", e)
             return False
     
-    def translate_to_sql(self, natural_query: str) -> Tuple[str, str]:
+    def refresh_outlet_count(self) -> int:
+        """
+        Recount the outlets (e.g. after the scraper has written to the database).
+        
+        Returns:
+            Number of outlets
+        """
+        with self._cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM outlets")
+            self._outlet_count = cursor.fetchone()[0]
+        return self._outlet_count
+    
+    def translate_to_sql(self, natural_query: str) -> Tuple[str, Tuple[str, ...], str]:
         """
         Translate natural language query to SQL.
         
@@ -130,73 +330,148 @@ class OutletSQLService:
             natural_query: Natural language query
             
         Returns:
-            Tuple of (SQL query, description)
+            Tuple of (SQL query with ? placeholders, parameters, description)
         """
         try:
             query_lower = natural_query.lower().strip()
             
-            # Try to match against known patterns
-            for pattern_info in self.query_patterns:
-                pattern = pattern_info['pattern']
-                match = re.search(pattern, query_lower)
+            # Try to match against known patterns (all of them in one search),
+            # skipping the search when no pattern's keyword occurs at all
+            match = None
+            if any(keyword in query_lower for keyword in self._pattern_keywords):
+                match = self._pattern_union.search(query_lower)
+            if match:
+                capture, pattern_info = self._pattern_targets[match.lastgroup]
+                
+                # Extract location/parameter if present (bound, never inlined)
+                sql_query = pattern_info['sql_template']
+                if capture is not None:
+                    params = self._like_params(sql_query, match.group(capture).strip())
+                else:
+                    params = ()
                 
-                if match:
-                    # Extract location/parameter if present
-                    if match.groups():
-                        location = match.group(1).strip()
-                        sql_query = pattern_info['sql_template'].format(location=location)
-                    else:
-                        sql_query = pattern_info['sql_template']
-                    
-                    return sql_query, pattern_info['description']
+                return sql_query, params, pattern_info['description']
             
-            # Default fallback for unmatched queries
-            if any(keyword in query_lower for keyword in ['ss2', 'petaling', 'jaya', 'damansara', 'klcc', 'mont', 'kiara']):
-                location = query_lower
-                sql_query = f"SELECT * FROM outlets WHERE LOWER(area) LIKE LOWER('%{location}%') OR LOWER(address) LIKE LOWER('%{location}%') OR LOWER(name) LIKE LOWER('%{location}%')"
-                return sql_query, "Search outlets by location"
+            # Default fallback for unmatched queries: search for the first known
+            # location mentioned
+            location_match = self._location_matcher.search(query_lower)
+            if location_match:
+                sql_query = LOCATION_SEARCH_SQL
+                return sql_query, self._like_params(sql_query, location_match.group(0)), "Search outlets by location"
             
             # Very general fallback
             sql_query = "SELECT name, area, address, hours FROM outlets ORDER BY area, name"
-            return sql_query, "List all outlets (general query)"
+            return sql_query, (), "List all outlets (general query)"
             
         except Exception as e:
-            logger.error(f"Error translating query: {e}")
-            return "SELECT name, area, address FROM outlets LIMIT 5", "Default outlet listing"
+            logger.error("Error translating query: %s", e)
+            return "SELECT name, area, address FROM outlets LIMIT 5", (), "Default outlet listing"
     
-    def execute_sql_query(self, sql_query: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _like_params(sql_query: str, location: str) -> Tuple[str, ...]:
+        """Bind a location as a substring LIKE pattern to every placeholder of a query."""
+        return (f"%{location}%",) * sql_query.count('?')
+    
+    def execute_sql_query(self, sql_query: str, params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
         """
         Execute SQL query against the database.
         
         Args:
             sql_query: SQL query to execute
+            params: Values bound to the query's ? placeholders
             
         Returns:
             List of result dictionaries
         """
         try:
-            # Basic SQL injection protection
-            if not self._is_safe_query(sql_query):
-                logger.warning(f"Potentially unsafe query blocked: {sql_query}")
-                return []
-            
-            with sqlite3.connect(self.db_file) as conn:
-                conn.row_factory = sqlite3.Row  # Enable column access by name
-                cursor = conn.cursor()
-                
-                cursor.execute(sql_query)
-                rows = cursor.fetchall()
-                
-                # Convert to list of dictionaries
-                results = [dict(row) for row in rows]
-                
-                logger.info(f"SQL query executed successfully: {len(results)} results")
-                return results
-                
+            return self._fetch(sql_query, params)
         except Exception as e:
-            logger.error(f"Error executing SQL query: {e}")
+            logger.error("Error executing SQL query: %s", e)
             return []
     
+    def _fetch(self, sql_query: str, params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+        """
+        Execute SQL query, letting database errors propagate.
+        
+        Args:
+            sql_query: SQL query to execute
+            params: Values bound to the query's ? placeholders
+            
+        Returns:
+            List of result dictionaries (empty if the query is blocked)
+        """
+        # Basic SQL injection protection (parameters are bound, not checked)
+        if not self._is_safe_query(sql_query):
+            logger.warning("Potentially unsafe query blocked: %s", sql_query)
+            return []
+        
+        with self._cursor() as cursor:
+            # Plain tuples, zipped with the column names read once per query,
+            # instead of a sqlite3.Row per row that is then copied into a dict
+            cursor.row_factory = None
+            cursor.execute(sql_query, params)
+            columns = [column[0] for column in cursor.description]
+            
+            # Convert in batches so the full set of raw tuples never sits
+            # alongside the dicts built from it
+            results = []
+            while True:
+                batch = cursor.fetchmany(FETCH_BATCH_SIZE)
+                if not batch:
+                    break
+                results.extend(dict(zip(columns, row)) for row in batch)
+        
+        logger.info("SQL query executed successfully: %d results", len(results))
+        return results
+    
+    def _outlet_rows(self) -> List[Tuple[Dict[str, Any], ...]]:
+        """
+        All outlets with their searchable fields, reloaded when the database file changes.
+        
+        Returns:
+            List of (row, area, address, name) with fields ASCII-lowered (None if NULL)
+        """
+        mtime = os.stat(self.db_file).st_mtime_ns
+        snapshot = self._outlet_snapshot
+        if snapshot is None or snapshot[0] != mtime:
+            rows = self._fetch("SELECT * FROM outlets")
+            lowered = [
+                tuple(_ascii_lower(row[column]) if row[column] is not None else None
+                      for column in ('area', 'address', 'name'))
+                for row in rows
+            ]
+            snapshot = (mtime, [(row, *fields) for row, fields in zip(rows, lowered)])
+            self._outlet_snapshot = snapshot
+        return snapshot[1]
+    
+    def _search_in_memory(self, sql_query: str, params: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a location search from the in-memory outlet rows.
+        
+        Matches exactly what LOCATION_SEARCH_SQL returns, in table order.
+        
+        Args:
+            sql_query: Translated SQL query
+            params: Its bound parameters
+            
+        Returns:
+            Matching rows, or None if the query must go to SQLite
+        """
+        if sql_query != LOCATION_SEARCH_SQL:
+            return None
+        
+        # Only plain '%text%' patterns; other LIKE wildcards need SQLite
+        location = _ascii_lower(params[0][1:-1])
+        if not location or '%' in location or '_' in location:
+            return None
+        
+        return [
+            row for row, area, address, name in self._outlet_rows()
+            if (area is not None and location in area)
+            or (address is not None and location in address)
+            or (name is not None and location in name)
+        ]
+    
     def _is_safe_query(self, sql_query: str) -> bool:
         """
         Basic SQL injection protection.
@@ -207,24 +482,12 @@ class OutletSQLService:
         Returns:
             True if query appears safe
         """
-        # Convert to lowercase for checking
-        query_lower = sql_query.lower()
-        
-        # Check for dangerous keywords
-        dangerous_keywords = [
-            'drop', 'delete', 'insert', 'update', 'alter', 'create',
-            'truncate', 'exec', 'execute', 'union', '--', ';'
-        ]
-        
-        for keyword in dangerous_keywords:
-            if keyword in query_lower:
-                return False
-        
-        # Must be a SELECT query
-        if not query_lower.strip().startswith('select'):
+        # Must be a SELECT query without any dangerous keyword (one scan)
+        if sql_query.lstrip()[:6].lower() != 'select':
             return False
-        
-        return True
+        if sql_query.isascii():
+            return _DANGEROUS_SQL_LOWER_RE.search(sql_query.lower()) is None
+        return _DANGEROUS_SQL_RE.search(sql_query) is None
     
     def query_outlets(self, natural_query: str) -> Dict[str, Any]:
         """
@@ -237,30 +500,42 @@ class OutletSQLService:
             Dictionary with query results and metadata
         """
         try:
-            # Translate to SQL
-            sql_query, description = self.translate_to_sql(natural_query)
-            
-            # Execute query
-            results = self.execute_sql_query(sql_query)
+            # Repeated questions skip translation and the database; queries that
+            # fail raise below and are not cached
+            cache_key = natural_query.lower().strip()
+            cached = self._result_cache.get(cache_key)
+            if cached is None:
+                # Translate to SQL
+                sql_query, params, description = self.translate_to_sql(natural_query)
+                
+                # Execute query (location searches are answered from memory)
+                results = self._search_in_memory(sql_query, params)
+                if results is None:
+                    results = self._fetch(sql_query, params)
+                cached = (sql_query, params, description, results)
+                self._result_cache.set(cache_key, cached)
+            sql_query, params, description, results = cached
             
             # Format response
             response = {
                 'original_query': natural_query,
                 'sql_query': sql_query,
+                'sql_params': list(params),
                 'description': description,
-                'results': results,
+                'results': list(results),
                 'total_results': len(results),
                 'timestamp': self._get_timestamp()
             }
             
-            logger.info(f"Query processed: '{natural_query}' -> {len(results)} results")
+            logger.info("Query processed: '%s' -> %d results", natural_query, len(results))
             return response
             
         except Exception as e:
-            logger.error(f"Error processing query: {e}")
+            logger.error("Error processing query: %s", e)
             return {
                 'original_query': natural_query,
                 'sql_query': '',
+                'sql_params': [],
                 'description': 'Error processing query',
                 'results': [],
                 'total_results': 0,
@@ -268,6 +543,16 @@ class OutletSQLService:
                 'timestamp': self._get_timestamp()
             }
     
+    def cache_clear(self):
+        """Forget cached query results and outlet rows (e.g. after the database is reloaded)."""
+        self._result_cache.clear()
+        self._outlet_snapshot = None
+        self._location_matcher = self._build_location_matcher()
+        try:
+            self.refresh_outlet_count()
+        except Exception as e:
+            logger.warning("Could not recount outlets: %s", e)
+    
     def format_results_for_user(self, query_result: Dict[str, Any]) -> str:
         """
         Format query results for user-friendly display.
@@ -305,52 +590,38 @@ class OutletSQLService:
                 response_parts = [f"I found {len(results)} outlets for your query '{original_query}':"]
                 
                 for i, outlet in enumerate(results, 1):
-                    name = outlet.get('name', f'Outlet {i}')
-                    area = outlet.get('area', '')
-                    address = outlet.get('address', '')
-                    
-                    outlet_info = f"\n{i}. **{name}**"
-                    if area:
-                        outlet_info += f" ({area})"
-                    if address:
-                        # Show shortened address
-                        short_address = address.split(',')[0] if ',' in address else address
-                        outlet_info += f"\n   📍 {short_address}"
-                    if outlet.get('hours'):
-                        outlet_info += f"\n   🕒 {outlet['hours']}"
-                    
-                    response_parts.append(outlet_info)
+                    entry = _listing_entry(
+                        outlet.get('name', f'Outlet {i}'),
+                        outlet.get('area', ''),
+                        outlet.get('address', ''),
+                        outlet.get('hours')
+                    )
+                    response_parts.append(f"\n{i}. {entry}")
                 
                 response_parts.append("\nWould you like more details about any specific outlet?")
                 return "\n".join(response_parts)
                 
         except Exception as e:
-            logger.error(f"Error formatting results: {e}")
+            logger.error("Error formatting results: %s", e)
             return f"I found some results for '{original_query}', but encountered an error formatting them. Please try again."
     
     def _get_timestamp(self) -> str:
-        """Get current timestamp."""
-        import time
-        return time.strftime('%Y-%m-%d %H:%M:%S')
+        """Get current timestamp (formatted at most once per second)."""
+        second = int(time.time())
+        cached_second, text = self._timestamp_cache
+        if second != cached_second:
+            text = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+            self._timestamp_cache = (second, text)
+        return text
     
     def get_database_schema(self) -> Dict[str, Any]:
         """
         Get database schema information.
         
         Returns:
-            Schema information dictionary
+            Schema information dictionary (built once, do not modify)
         """
-        return {
-            'database': self.db_file,
-            'tables': self.schema_info,
-            'sample_queries': [
-                "outlets in Petaling Jaya",
-                "opening hours SS2",
-                "phone number KLCC",
-                "all outlets",
-                "count outlets"
-            ]
-        }
+        return self._database_schema
     
     def get_service_status(self) -> Dict[str, Any]:
         """
@@ -360,18 +631,18 @@ class OutletSQLService:
             Service status dictionary
         """
         try:
-            with sqlite3.connect(self.db_file) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM outlets")
-                outlet_count = cursor.fetchone()[0]
-                
-                return {
-                    'service': 'OutletSQLService',
-                    'status': 'healthy',
-                    'database': self.db_file,
-                    'outlet_count': outlet_count,
-                    'patterns_loaded': len(self.query_patterns)
-                }
+            # The count is kept from validation; recount only if that failed
+            outlet_count = self._outlet_count
+            if outlet_count is None:
+                outlet_count = self.refresh_outlet_count()
+            
+            return {
+                'service': 'OutletSQLService',
+                'status': 'healthy',
+                'database': self.db_file,
+                'outlet_count': outlet_count,
+                'patterns_loaded': len(self.query_patterns)
+            }
         except Exception as e:
             return {
                 'service': 'OutletSQLService',
@@ -382,6 +653,21 @@ class OutletSQLService:
             }
 
 
+@functools.lru_cache(maxsize=LISTING_CACHE_SIZE, typed=True)
+def _listing_entry(name: Any, area: Any, address: Any, hours: Any) -> str:
+    """Render one outlet of a multi-result listing (without its number), formatted once per distinct outlet."""
+    # Collect the pieces and join once instead of growing a str
+    parts = [f"**{name}**"]
+    if area:
+        parts.append(f" ({area})")
+    if address:
+        # Show shortened address
+        parts.append(f"\n   📍 {address.partition(',')[0]}")
+    if hours:
+        parts.append(f"\n   🕒 {hours}")
+    return "".join(parts)
+
+
 def create_sql_service() -> OutletSQLService:
     """
     Factory function to create SQL service.
@@ -11,9 +11,21 @@ Modules:
 - tools: Phase 3+ - Tool integration for calculator and APIs
 """
 
-from .memory_bot import MemoryBot, SimpleLLM
-from .planner import PlannerBot, ActionType, PlannerDecision, IntentClassifier
-from .tools import ToolManager, CalculatorTool, calculate_expression
+import importlib
+
+# Submodule defining each exported name. They are imported on first access
+# (PEP 562), so importing one submodule does not pull in LangChain for all.
+_EXPORTS = {
+    "MemoryBot": "memory_bot",
+    "SimpleLLM": "memory_bot",
+    "PlannerBot": "planner",
+    "ActionType": "planner",
+    "PlannerDecision": "planner",
+    "IntentClassifier": "planner",
+    "ToolManager": "tools",
+    "CalculatorTool": "tools",
+    "calculate_expression": "tools",
+}
 
 __version__ = "1.0.0"
 __author__ = "Mindhive Assessment Candidate"
@@ -29,4 +41,19 @@ __all__ = [
     "ToolManager",
     "CalculatorTool",
     "calculate_expression"
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """Import an exported name from its submodule on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List exported names alongside the ones already loaded."""
+    return sorted(set(globals()) | set(__all__))
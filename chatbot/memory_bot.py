@@ -6,19 +6,48 @@ This module implements a LangChain-based chatbot with memory capabilities
 to track multi-turn conversations and maintain state across interactions.
 
 Key Features:
-- Uses ConversationBufferMemory for state tracking
+- Uses ConversationBufferWindowMemory for state tracking
 - Handles the example conversation flow about outlets
 - Maintains context across multiple turns
 - Simple fallback responses when no specific intent is detected
 """
 
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationChain
 from langchain.llms.base import LLM
 from langchain.schema import Generation, LLMResult
-from typing import List, Optional, Any
+from types import MappingProxyType
+from typing import List, Optional, Any, Dict, Mapping, Tuple
 import re
 
+# Conversation turns the prompt carries; older turns stay stored but unsent
+MEMORY_WINDOW_SIZE = 6
+
+# Outlets knowledge base of the demo LLM, built once at import
+_OUTLETS_DB: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "ss2": MappingProxyType({
+        "name": "SS2 Outlet",
+        "location": "Petaling Jaya SS2",
+        "opening_time": "9:00AM",
+        "closing_time": "10:00PM",
+        "services": ("dine-in", "takeaway", "delivery")
+    }),
+    "pj": MappingProxyType({
+        "outlets": ("SS2", "Damansara", "PJ Old Town"),
+        "count": 3
+    })
+})
+
+
+# Keyword groups of the demo LLM, each matched as substrings in one scan
+_PJ_RE = re.compile(r'pj|petaling jaya')
+_TIME_WORDS_RE = re.compile(r'time|open|opening|hour')
+_GREETINGS_RE = re.compile(r'hello|hi|hey')
+
+# "ss2" anywhere in the conversation, ignoring ASCII case like str.lower()
+_SS2_ANY_CASE_RE = re.compile(r'ss2', re.IGNORECASE | re.ASCII)
+
+# Inputs that end the interactive session
+_EXIT_COMMANDS = frozenset({'quit', 'exit', 'bye', 'goodbye'})
+
 
 class SimpleLLM(LLM):
     """
@@ -31,21 +60,9 @@ class SimpleLLM(LLM):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
     
-    def _get_outlets_db(self):
-        """Get the outlets knowledge base."""
-        return {
-            "ss2": {
-                "name": "SS2 Outlet",
-                "location": "Petaling Jaya SS2",
-                "opening_time": "9:00AM",
-                "closing_time": "10:00PM",
-                "services": ["dine-in", "takeaway", "delivery"]
-            },
-            "pj": {
-                "outlets": ["SS2", "Damansara", "PJ Old Town"],
-                "count": 3
-            }
-        }
+    def _get_outlets_db(self) -> Mapping[str, Mapping[str, Any]]:
+        """Get the outlets knowledge base (shared, read-only)."""
+        return _OUTLETS_DB
     
     @property
     def _llm_type(self) -> str:
@@ -58,14 +75,16 @@ class SimpleLLM(LLM):
         This method analyzes the conversation history and current input
         to provide contextually appropriate responses.
         """
-        # Extract current input (last human message)
-        lines = prompt.strip().split('\n')
+        # Extract current input (last human message), jumping straight to the
+        # last line that starts with "Human: " instead of splitting every line
+        text = prompt.strip()
+        start = text.rfind("\nHuman: ") + 1
         current_input = ""
         
-        for line in reversed(lines):
-            if line.startswith("Human: "):
-                current_input = line.replace("Human: ", "").lower()
-                break
+        if start or text.startswith("Human: "):
+            end = text.find('\n', start)
+            line = text[start:end] if end != -1 else text[start:]
+            current_input = line.replace("Human: ", "").lower()
         
         # Response logic based on conversation patterns
         return self._generate_response(current_input, prompt)
@@ -84,25 +103,27 @@ class SimpleLLM(LLM):
         current_input = current_input.strip()
         
         # Check for outlet location inquiries
-        if "outlet" in current_input and any(location in current_input for location in ["pj", "petaling jaya"]):
+        if "outlet" in current_input and _PJ_RE.search(current_input):
             return "Yes! We have several outlets in Petaling Jaya. Which outlet are you referring to?"
         
+        asks_time = _TIME_WORDS_RE.search(current_input) is not None
+        
         # Check for specific outlet inquiries (SS2)
         if "ss2" in current_input:
-            if any(time_word in current_input for time_word in ["time", "open", "opening", "hour"]):
+            if asks_time:
                 return "Ah yes, the SS2 outlet opens at 9:00AM and closes at 10:00PM."
             else:
                 return "The SS2 outlet is located in Petaling Jaya SS2. What would you like to know about it?"
         
         # Check for general opening time questions
-        if any(time_word in current_input for time_word in ["time", "open", "opening", "hour"]):
-            if "ss2" in full_prompt.lower():
+        if asks_time:
+            if _SS2_ANY_CASE_RE.search(full_prompt):
                 return "The SS2 outlet opens at 9:00AM and closes at 10:00PM."
             else:
                 return "Which outlet's opening time would you like to know?"
         
         # Check for greetings
-        if any(greeting in current_input for greeting in ["hello", "hi", "hey"]):
+        if _GREETINGS_RE.search(current_input):
             return "Hello! I'm here to help you with information about our outlets. How can I assist you today?"
         
         # Default response for unrecognized inputs
@@ -122,15 +143,32 @@ class MemoryBot:
     Main chatbot class implementing Phase 1 requirements.
     
     Features:
-    - Multi-turn conversation tracking using ConversationBufferMemory
+    - Multi-turn conversation tracking using ConversationBufferWindowMemory
     - State management across conversation turns
     - Example conversation flow implementation
     """
     
-    def __init__(self):
-        """Initialize the memory-based chatbot."""
-        # Initialize conversation memory
-        self.memory = ConversationBufferMemory(
+    def __init__(self, window_size: int = MEMORY_WINDOW_SIZE):
+        """
+        Initialize the memory-based chatbot.
+        
+        Args:
+            window_size: Number of most recent turns included in the prompt
+        """
+        # Imported here, only when a bot is built (SimpleLLM needs neither)
+        from langchain.chains import ConversationChain
+        from langchain.memory import ConversationBufferWindowMemory
+        
+        self.window_size = window_size
+        
+        # Rendered memory, keyed by (history version, message count); the
+        # version is bumped whenever this bot rewrites its memory
+        self._history_version = 0
+        self._history_cache: Tuple[Optional[Tuple[int, int]], str] = (None, "")
+        
+        # Initialize conversation memory, windowed to bound prompt size
+        self.memory = ConversationBufferWindowMemory(
+            k=window_size,
             memory_key="history",
             return_messages=False,
             human_prefix="Human",
@@ -163,10 +201,56 @@ class MemoryBot:
         """
         try:
             response = self.conversation.predict(input=user_input)
+            self._history_version += 1
             return response
         except Exception as e:
             return f"Sorry, I encountered an error: {str(e)}. Please try again."
     
+    def respond(self, messages: List[Dict[str, str]], user_input: str) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        Answer user input against an explicit conversation history.
+        
+        Unlike chat(), this leaves the bot's own memory untouched, so a single
+        bot can serve many conversations (and threads) at once. Only the last
+        window_size turns are rendered into the prompt.
+        
+        Args:
+            messages: Conversation so far, as returned by export_messages()
+            user_input: User's message
+            
+        Returns:
+            Tuple of (bot response, conversation including this turn)
+        """
+        try:
+            prompt = self.conversation.prompt.format(
+                history=self.format_history(messages[-2 * self.window_size:]),
+                input=user_input
+            )
+            response = self.llm.invoke(prompt)
+        except Exception as e:
+            return f"Sorry, I encountered an error: {str(e)}. Please try again.", messages
+        
+        return response, messages + [
+            {"role": "human", "content": user_input},
+            {"role": "ai", "content": response}
+        ]
+    
+    @staticmethod
+    def format_history(messages: List[Dict[str, str]]) -> str:
+        """
+        Render messages the way get_memory_contents() renders the bot's memory.
+        
+        Args:
+            messages: Messages as returned by export_messages()
+            
+        Returns:
+            String representation of the conversation history
+        """
+        return "\n".join(
+            f"{'Human' if message['role'] == 'human' else 'AI'}: {message['content']}"
+            for message in messages
+        )
+    
     def get_memory_contents(self) -> str:
         """
         Get current conversation history from memory.
@@ -174,13 +258,47 @@ class MemoryBot:
         Returns:
             String representation of conversation history
         """
-        return self.memory.buffer
+        # Rendered once per memory change rather than on every call
+        key = (self._history_version, len(self.memory.chat_memory.messages))
+        cached_key, contents = self._history_cache
+        if cached_key != key:
+            contents = self.memory.buffer
+            self._history_cache = (key, contents)
+        return contents
     
     def clear_memory(self):
         """Clear conversation memory."""
         self.memory.clear()
+        self._history_version += 1
         print("🧹 Memory cleared!")
     
+    def export_messages(self) -> List[Dict[str, str]]:
+        """
+        Export the conversation history as plain, JSON-serializable messages.
+        
+        Returns:
+            List of {"role": "human" | "ai", "content": str} dictionaries
+        """
+        return [
+            {"role": message.type, "content": message.content}
+            for message in self.memory.chat_memory.messages
+        ]
+    
+    def load(self, messages: List[Dict[str, str]]):
+        """
+        Replace the conversation history with previously exported messages.
+        
+        Args:
+            messages: Messages as returned by export_messages()
+        """
+        self.memory.clear()
+        self._history_version += 1
+        for message in messages:
+            if message["role"] == "human":
+                self.memory.chat_memory.add_user_message(message["content"])
+            else:
+                self.memory.chat_memory.add_ai_message(message["content"])
+    
     def run_interactive(self):
         """
         Run interactive chat session.
@@ -199,7 +317,7 @@ class MemoryBot:
                 user_input = input("You: ").strip()
                 
                 # Check for exit commands
-                if user_input.lower() in ['quit', 'exit', 'bye', 'goodbye']:
+                if user_input.lower() in _EXIT_COMMANDS:
                     print("👋 Goodbye! Thanks for chatting!")
                     break
                 
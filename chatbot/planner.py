@@ -12,6 +12,7 @@ Key Features:
 - Extensible framework for tool integration in later phases
 """
 
+import functools
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Any
 import re
@@ -20,8 +21,47 @@ from dataclasses import dataclass
 from .memory_bot import MemoryBot
 from .tools import ToolManager
 
+# Calculation extraction patterns, compiled once at import
+_MATH_EXPRESSION_RE = re.compile(r'(\d+(?:\.\d+)?\s*[\+\-\*\/\%\^]\s*\d+(?:\.\d+)?)')
+_WHATS_RE = re.compile(r'what[\'s]*\s+(.+)', re.IGNORECASE)
+_WHAT_IS_RE = re.compile(r'what\s+is\s+(.+)', re.IGNORECASE)
+_CALCULATE_RE = re.compile(r'calculate\s+(.+)', re.IGNORECASE)
+_HAS_ARITHMETIC_RE = re.compile(r'\d+.*[\+\-\*\/].*\d+')
 
-class ActionType(Enum):
+# Distinct normalized inputs whose pattern-based intent is remembered
+INTENT_CACHE_SIZE = 1024
+
+# Keyword groups, each matched as substrings in one scan
+_OUTLET_CONTEXT_RE = re.compile(r'outlet|store|location')
+_OUTLET_FOLLOWUP_RE = re.compile(r'ss2|pj|damansara|time|hour')
+_PRODUCT_CONTEXT_RE = re.compile(r'product|tumbler|coffee')
+_PJ_RE = re.compile(r'pj|petaling jaya')
+_KL_RE = re.compile(r'kl|kuala lumpur')
+_HOURS_WORDS_RE = re.compile(r'time|hour|open|close')
+_LOCATION_WORDS_RE = re.compile(r'address|where|direction')
+_SERVICES_WORDS_RE = re.compile(r'service|offer|available')
+_FAREWELL_RE = re.compile(r'bye|goodbye|thanks|thank you')
+
+# Outlet queries too vague to run without asking for a location
+_VAGUE_OUTLET_QUERIES = frozenset({'outlet', 'store', 'location'})
+
+# Follow-up question for each kind of missing information, most important first
+_ASK_MESSAGES = {
+    "specific_location": "Which specific outlet are you asking about?",
+    "location": "Which location or area are you interested in?",
+    "query_type": "What would you like to know about the outlet? (hours, location, services)",
+    "mathematical_expression": "What calculation would you like me to perform?",
+    "product_preferences": "What type of product are you looking for?",
+}
+_ASK_PRIORITY = tuple(_ASK_MESSAGES)
+
+
+def _compile_any(patterns: List[str], flags: int = re.IGNORECASE) -> "re.Pattern[str]":
+    """Combine alternative patterns into one compiled regex (case-insensitive by default)."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+
+
+class ActionType(str, Enum):
     """
     Enumeration of possible actions the planner can decide to take.
     
@@ -30,6 +70,9 @@ class ActionType(Enum):
     RAG_SEARCH: Search product knowledge base using RAG
     SQL_QUERY: Query outlet database using Text2SQL
     END: Conversation is complete, no further action needed
+    
+    Members are also str instances equal to their values, so they serialize
+    (and compare against plain strings) directly.
     """
     ASK = "ask"
     CALCULATE = "calculate" 
@@ -38,7 +81,7 @@ class ActionType(Enum):
     END = "end"
 
 
-@dataclass
+@dataclass(slots=True)
 class PlannerDecision:
     """
     Represents a planning decision with action type and reasoning.
@@ -99,6 +142,25 @@ class IntentClassifier:
             r'^(hi|hello|hey|good\s+(morning|afternoon|evening))',
             r'(thank\s+you|thanks|bye|goodbye|see\s+you)'
         ]
+        
+        # Each intent's patterns are checked in a single scan of the input
+        self._math_regex = _compile_any(self.math_patterns)
+        self._product_regex = _compile_any(self.product_patterns)
+        self._outlet_regex = _compile_any(self.outlet_patterns)
+        self._greeting_regex = _compile_any(self.greeting_patterns)
+        
+        # Case-sensitive twins for lowercased ASCII input, where lowering is
+        # exact and spares the regex engine per-character case folding
+        self._lowercase_regexes = tuple(
+            _compile_any(patterns, 0)
+            for patterns in (self.math_patterns, self.product_patterns,
+                             self.outlet_patterns, self.greeting_patterns)
+        )
+        
+        # Repeated inputs ("hello", "ss2", ...) skip the pattern scans
+        self._classify_by_patterns = functools.lru_cache(maxsize=INTENT_CACHE_SIZE)(
+            self._classify_by_patterns_uncached
+        )
     
     def classify_intent(self, user_input: str, conversation_history: str = "") -> Tuple[str, float]:
         """
@@ -111,37 +173,65 @@ class IntentClassifier:
         Returns:
             Tuple of (intent_type, confidence_score)
         """
-        user_input_lower = user_input.lower().strip()
+        return self.classify_normalized_intent(user_input.lower().strip(), conversation_history)
+    
+    def classify_normalized_intent(self, user_input_lower: str, conversation_history: str = "") -> Tuple[str, float]:
+        """
+        Classify the intent of input already normalized by the caller.
+        
+        Args:
+            user_input_lower: The user's message, lowercased and stripped
+            conversation_history: Previous conversation context
+            
+        Returns:
+            Tuple of (intent_type, confidence_score)
+        """
+        # Intent from the input alone (memoized, as it ignores the history)
+        intent = self._classify_by_patterns(user_input_lower)
+        if intent is not None:
+            return intent
+        
+        # Context-based classification using conversation history
+        if conversation_history:
+            return self._classify_with_context(user_input_lower, conversation_history)
+        
+        # Default to general inquiry
+        return "general", 0.5
+    
+    def _classify_by_patterns_uncached(self, user_input_lower: str) -> Optional[Tuple[str, float]]:
+        """
+        Classify normalized input by the intent patterns alone.
+        
+        Args:
+            user_input_lower: Lowercased, stripped user input
+            
+        Returns:
+            Tuple of (intent_type, confidence_score), or None if no pattern matches
+        """
+        if user_input_lower.isascii():
+            math_regex, product_regex, outlet_regex, greeting_regex = self._lowercase_regexes
+        else:
+            math_regex, product_regex, outlet_regex, greeting_regex = (
+                self._math_regex, self._product_regex, self._outlet_regex, self._greeting_regex
+            )
         
         # Check for mathematical intent
-        if self._matches_patterns(user_input_lower, self.math_patterns):
+        if math_regex.search(user_input_lower):
             return "calculation", 0.9
         
         # Check for product search intent
-        if self._matches_patterns(user_input_lower, self.product_patterns):
+        if product_regex.search(user_input_lower):
             return "product_search", 0.8
         
         # Check for outlet/location intent
-        if self._matches_patterns(user_input_lower, self.outlet_patterns):
+        if outlet_regex.search(user_input_lower):
             return "outlet_query", 0.8
         
         # Check for greetings
-        if self._matches_patterns(user_input_lower, self.greeting_patterns):
+        if greeting_regex.search(user_input_lower):
             return "greeting", 0.9
         
-        # Context-based classification using conversation history
-        if conversation_history:
-            return self._classify_with_context(user_input_lower, conversation_history)
-        
-        # Default to general inquiry
-        return "general", 0.5
-    
-    def _matches_patterns(self, text: str, patterns: List[str]) -> bool:
-        """Check if text matches any of the given regex patterns."""
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return None
     
     def _classify_with_context(self, user_input: str, history: str) -> Tuple[str, float]:
         """
@@ -157,16 +247,17 @@ class IntentClassifier:
         history_lower = history.lower()
         
         # If previous conversation was about outlets and user gives a location
-        if any(word in history_lower for word in ['outlet', 'store', 'location']):
-            if any(word in user_input for word in ['ss2', 'pj', 'damansara', 'time', 'hour']):
+        if _OUTLET_CONTEXT_RE.search(history_lower):
+            if _OUTLET_FOLLOWUP_RE.search(user_input):
                 return "outlet_query", 0.9
         
         # If previous conversation was about products and user gives specifications
-        if any(word in history_lower for word in ['product', 'tumbler', 'coffee']):
+        if _PRODUCT_CONTEXT_RE.search(history_lower):
             return "product_search", 0.8
         
-        # If user provides additional context after a question
-        if '?' in history_lower and len(user_input.split()) <= 3:
+        # If user provides additional context after a question (splitting
+        # past the limit once is enough to tell whether it is exceeded)
+        if '?' in history_lower and len(user_input.split(maxsplit=3)) <= 3:
             return "context_addition", 0.7
         
         return "general", 0.5
@@ -188,29 +279,34 @@ class InformationExtractor:
             Mathematical expression string or None
         """
         # Look for mathematical expressions
-        math_match = re.search(r'(\d+(?:\.\d+)?\s*[\+\-\*\/\%\^]\s*\d+(?:\.\d+)?)', user_input)
+        math_match = _MATH_EXPRESSION_RE.search(user_input)
         if math_match:
             return math_match.group(1)
         
+        # Each candidate below is part of the input and must pass the
+        # arithmetic check, so one check of the whole input rules them all out
+        if _HAS_ARITHMETIC_RE.search(user_input) is None:
+            return None
+        
         # Look for "what's X" patterns (handle contractions)
-        whats_match = re.search(r'what[\'s]*\s+(.+)', user_input, re.IGNORECASE)
+        whats_match = _WHATS_RE.search(user_input)
         if whats_match:
             expression = whats_match.group(1).strip()
-            if re.search(r'\d+.*[\+\-\*\/].*\d+', expression):
+            if _HAS_ARITHMETIC_RE.search(expression):
                 return expression
         
         # Look for "what is X" patterns
-        what_is_match = re.search(r'what\s+is\s+(.+)', user_input, re.IGNORECASE)
+        what_is_match = _WHAT_IS_RE.search(user_input)
         if what_is_match:
             expression = what_is_match.group(1).strip()
-            if re.search(r'\d+.*[\+\-\*\/].*\d+', expression):
+            if _HAS_ARITHMETIC_RE.search(expression):
                 return expression
         
         # Look for "calculate X" patterns
-        calc_match = re.search(r'calculate\s+(.+)', user_input, re.IGNORECASE)
+        calc_match = _CALCULATE_RE.search(user_input)
         if calc_match:
             expression = calc_match.group(1).strip()
-            if re.search(r'\d+.*[\+\-\*\/].*\d+', expression):
+            if _HAS_ARITHMETIC_RE.search(expression):
                 return expression
         
         return None
@@ -222,26 +318,37 @@ class InformationExtractor:
         Args:
             user_input: User's message
             
+        Returns:
+            Dictionary with location details
+        """
+        return self.extract_normalized_location_info(user_input.lower())
+    
+    def extract_normalized_location_info(self, user_input_lower: str) -> Dict[str, str]:
+        """
+        Extract location-related information from input already lowercased by the caller.
+        
+        Args:
+            user_input_lower: User's message, lowercased
+            
         Returns:
             Dictionary with location details
         """
         info = {}
-        user_input_lower = user_input.lower()
         
         # Extract specific locations
         if 'ss2' in user_input_lower:
             info['location'] = 'SS2'
-        elif any(loc in user_input_lower for loc in ['pj', 'petaling jaya']):
+        elif _PJ_RE.search(user_input_lower):
             info['area'] = 'Petaling Jaya'
-        elif any(loc in user_input_lower for loc in ['kl', 'kuala lumpur']):
+        elif _KL_RE.search(user_input_lower):
             info['area'] = 'Kuala Lumpur'
         
         # Extract query type
-        if any(word in user_input_lower for word in ['time', 'hour', 'open', 'close']):
+        if _HOURS_WORDS_RE.search(user_input_lower):
             info['query_type'] = 'hours'
-        elif any(word in user_input_lower for word in ['address', 'where', 'direction']):
+        elif _LOCATION_WORDS_RE.search(user_input_lower):
             info['query_type'] = 'location'
-        elif any(word in user_input_lower for word in ['service', 'offer', 'available']):
+        elif _SERVICES_WORDS_RE.search(user_input_lower):
             info['query_type'] = 'services'
         
         return info
@@ -265,7 +372,7 @@ class InformationExtractor:
             # For Text2SQL, we can handle any natural language query
             # Only require missing info if the query is too vague
             text = extracted_info.get('text', '').lower()
-            if len(text.strip()) < 3 or text in ['outlet', 'store', 'location']:
+            if len(text.strip()) < 3 or text in _VAGUE_OUTLET_QUERIES:
                 missing.append("location")
         
         elif intent == "product_search":
@@ -275,8 +382,12 @@ class InformationExtractor:
                 missing.append("product_preferences")
         
         elif intent == "calculation":
-            # Check if we have a valid mathematical expression
-            expression = self.extract_calculation_expression(extracted_info.get('text', ''))
+            # Check if we have a valid mathematical expression (reusing the one
+            # plan_next_action already extracted, if any)
+            if 'expression' in extracted_info:
+                expression = extracted_info['expression']
+            else:
+                expression = self.extract_calculation_expression(extracted_info.get('text', ''))
             if not expression:
                 missing.append("mathematical_expression")
         
@@ -301,6 +412,14 @@ class PlannerBot:
         self.enable_tools = enable_tools
         self.tool_manager = ToolManager() if enable_tools else None
         
+        # Decision for each intent with complete information (see _make_decision)
+        self._decision_handlers = {
+            "calculation": self._decide_calculation,
+            "product_search": self._decide_product_search,
+            "outlet_query": self._decide_outlet_query,
+            "greeting": self._decide_greeting,
+        }
+        
         print("🧠 Planner Bot initialized!")
         print("🎯 I can analyze intent and plan next actions:")
         print("   • ASK follow-up questions")
@@ -313,28 +432,36 @@ class PlannerBot:
             print("🔧 Tool integration enabled!")
         print()
     
-    def plan_next_action(self, user_input: str) -> PlannerDecision:
+    def plan_next_action(self, user_input: str, conversation_history: Optional[str] = None) -> PlannerDecision:
         """
         Analyze user input and conversation context to plan the next action.
         
         Args:
             user_input: The user's current message
+            conversation_history: Conversation so far (defaults to the bot's own memory)
             
         Returns:
             PlannerDecision with action type, reasoning, and parameters
         """
         # Get conversation history from memory
-        conversation_history = self.memory_bot.get_memory_contents()
+        if conversation_history is None:
+            conversation_history = self.memory_bot.get_memory_contents()
+        
+        # Normalize once for the keyword checks below (extraction of values
+        # and the query text keep the original input)
+        user_input_lower = user_input.lower().strip()
         
         # Classify intent
-        intent, confidence = self.intent_classifier.classify_intent(user_input, conversation_history)
+        intent, confidence = self.intent_classifier.classify_normalized_intent(
+            user_input_lower, conversation_history
+        )
         
         # Extract information based on intent
         if intent == "calculation":
             expression = self.info_extractor.extract_calculation_expression(user_input)
             extracted_info = {"expression": expression, "text": user_input}
         elif intent == "outlet_query":
-            extracted_info = self.info_extractor.extract_location_info(user_input)
+            extracted_info = self.info_extractor.extract_normalized_location_info(user_input_lower)
             extracted_info["text"] = user_input
         else:
             extracted_info = {"text": user_input}
@@ -364,50 +491,13 @@ class PlannerBot:
         if missing_info:
             return self._plan_ask_action(intent, missing_info, extracted_info)
         
-        # If we have complete information, choose appropriate action
-        if intent == "calculation" and extracted_info.get("expression"):
-            return PlannerDecision(
-                action=ActionType.CALCULATE,
-                reasoning=f"Mathematical expression detected: '{extracted_info['expression']}'. Ready to calculate.",
-                parameters={"expression": extracted_info["expression"]},
-                confidence=confidence
-            )
-        
-        elif intent == "product_search":
-            query = extracted_info.get("text", "")
-            return PlannerDecision(
-                action=ActionType.RAG_SEARCH,
-                reasoning="Product inquiry detected. Will search product knowledge base.",
-                parameters={"query": query},
-                confidence=confidence
-            )
-        
-        elif intent == "outlet_query":
-            # Use the full text as the query for Text2SQL
-            query = extracted_info.get("text", "")
-            return PlannerDecision(
-                action=ActionType.SQL_QUERY,
-                reasoning="Outlet/location query detected. Will query outlet database.",
-                parameters={"location_info": {"text": query}},
-                confidence=confidence
-            )
-        
-        elif intent == "greeting":
-            text = extracted_info.get("text", "").lower()
-            if any(word in text for word in ["bye", "goodbye", "thanks", "thank you"]):
-                return PlannerDecision(
-                    action=ActionType.END,
-                    reasoning="Conversation ending detected.",
-                    parameters={},
-                    confidence=confidence
-                )
-            else:
-                return PlannerDecision(
-                    action=ActionType.ASK,
-                    reasoning="Greeting detected. Will respond and ask how to help.",
-                    parameters={"message": "Hello! How can I help you today?"},
-                    confidence=confidence
-                )
+        # If we have complete information, choose appropriate action (one
+        # lookup by intent; a handler returns None to fall through)
+        handler = self._decision_handlers.get(intent)
+        if handler is not None:
+            decision = handler(confidence, extracted_info)
+            if decision is not None:
+                return decision
         
         # Default: Ask for more information
         return PlannerDecision(
@@ -417,6 +507,56 @@ class PlannerBot:
             confidence=0.5
         )
     
+    def _decide_calculation(self, confidence: float, extracted_info: Dict[str, Any]) -> Optional[PlannerDecision]:
+        """Plan a CALCULATE action, if an expression was extracted."""
+        if not extracted_info.get("expression"):
+            return None
+        return PlannerDecision(
+            action=ActionType.CALCULATE,
+            reasoning=f"Mathematical expression detected: '{extracted_info['expression']}'. Ready to calculate.",
+            parameters={"expression": extracted_info["expression"]},
+            confidence=confidence
+        )
+    
+    def _decide_product_search(self, confidence: float, extracted_info: Dict[str, Any]) -> PlannerDecision:
+        """Plan a RAG_SEARCH action over the product knowledge base."""
+        query = extracted_info.get("text", "")
+        return PlannerDecision(
+            action=ActionType.RAG_SEARCH,
+            reasoning="Product inquiry detected. Will search product knowledge base.",
+            parameters={"query": query},
+            confidence=confidence
+        )
+    
+    def _decide_outlet_query(self, confidence: float, extracted_info: Dict[str, Any]) -> PlannerDecision:
+        """Plan a SQL_QUERY action over the outlet database."""
+        # Use the full text as the query for Text2SQL
+        query = extracted_info.get("text", "")
+        return PlannerDecision(
+            action=ActionType.SQL_QUERY,
+            reasoning="Outlet/location query detected. Will query outlet database.",
+            parameters={"location_info": {"text": query}},
+            confidence=confidence
+        )
+    
+    def _decide_greeting(self, confidence: float, extracted_info: Dict[str, Any]) -> PlannerDecision:
+        """Plan END for a farewell, or ASK in reply to a greeting."""
+        text = extracted_info.get("text", "").lower()
+        if _FAREWELL_RE.search(text):
+            return PlannerDecision(
+                action=ActionType.END,
+                reasoning="Conversation ending detected.",
+                parameters={},
+                confidence=confidence
+            )
+        else:
+            return PlannerDecision(
+                action=ActionType.ASK,
+                reasoning="Greeting detected. Will respond and ask how to help.",
+                parameters={"message": "Hello! How can I help you today?"},
+                confidence=confidence
+            )
+    
     def _plan_ask_action(self, intent: str, missing_info: List[str], extracted_info: Dict[str, Any]) -> PlannerDecision:
         """
         Plan an ASK action to gather missing information.
@@ -429,18 +569,11 @@ class PlannerBot:
         Returns:
             PlannerDecision for ASK action
         """
-        if "specific_location" in missing_info:
-            message = "Which specific outlet are you asking about?"
-        elif "location" in missing_info:
-            message = "Which location or area are you interested in?"
-        elif "query_type" in missing_info:
-            message = "What would you like to know about the outlet? (hours, location, services)"
-        elif "mathematical_expression" in missing_info:
-            message = "What calculation would you like me to perform?"
-        elif "product_preferences" in missing_info:
-            message = "What type of product are you looking for?"
-        else:
-            message = "Could you please provide more details?"
+        # Ask about the highest-priority missing item
+        message = next(
+            (_ASK_MESSAGES[item] for item in _ASK_PRIORITY if item in missing_info),
+            "Could you please provide more details?"
+        )
         
         return PlannerDecision(
             action=ActionType.ASK,
@@ -449,24 +582,39 @@ class PlannerBot:
             confidence=0.8
         )
     
-    def execute_conversation_turn(self, user_input: str) -> Dict[str, Any]:
+    def execute_conversation_turn(self, user_input: str,
+                                  memory_state: Optional[Dict[str, Any]] = None,
+                                  update_memory: bool = True) -> Dict[str, Any]:
         """
         Execute a complete conversation turn: plan, act, and respond.
         
         Args:
             user_input: User's message
+            memory_state: Optional per-conversation state {"messages": [...]} to use
+                          instead of the bot's own memory; its message list is
+                          replaced with one including this turn. Passing it lets
+                          one planner serve many conversations.
+            update_memory: Record the turn in memory_state; pass False when the
+                           caller runs memory_bot.respond() itself (e.g. concurrently)
             
         Returns:
             Dictionary with planning decision and response
         """
         # Plan the next action
-        decision = self.plan_next_action(user_input)
-        
-        # Execute actions based on decision
-        if decision.action == ActionType.ASK:
+        if memory_state is None:
+            decision = self.plan_next_action(user_input)
+        else:
+            messages = memory_state.get("messages", [])
+            history = MemoryBot.format_history(messages)
+            decision = self.plan_next_action(user_input, history)
+        
+        # Execute actions based on decision (members are singletons, so
+        # identity checks suffice)
+        action = decision.action
+        if action is ActionType.ASK:
             response = decision.parameters.get("message", "How can I help you?")
         
-        elif decision.action == ActionType.CALCULATE:
+        elif action is ActionType.CALCULATE:
             if self.enable_tools and self.tool_manager:
                 # Execute calculator tool
                 expression = decision.parameters.get('expression', '')
@@ -478,7 +626,7 @@ class PlannerBot:
             else:
                 response = f"I would calculate: {decision.parameters.get('expression', 'N/A')} (Calculator tool will be integrated in Phase 3)"
         
-        elif decision.action == ActionType.RAG_SEARCH:
+        elif action is ActionType.RAG_SEARCH:
             if self.enable_tools and self.tool_manager:
                 # Execute product search tool
                 query = decision.parameters.get('query', '')
@@ -490,7 +638,7 @@ class PlannerBot:
             else:
                 response = f"I would search for: '{decision.parameters.get('query', 'N/A')}' (Product search tool not available)"
         
-        elif decision.action == ActionType.SQL_QUERY:
+        elif action is ActionType.SQL_QUERY:
             if self.enable_tools and self.tool_manager:
                 # Execute outlet query tool
                 location_info = decision.parameters.get('location_info', {})
@@ -503,20 +651,29 @@ class PlannerBot:
             else:
                 response = f"I would query outlet database for: {decision.parameters.get('location_info', {})} (Outlet query tool not available)"
         
-        elif decision.action == ActionType.END:
+        elif action is ActionType.END:
             response = "Thank you! Have a great day!"
         
         else:
             response = "I'm not sure how to help with that. Could you please clarify?"
         
         # Update memory with the conversation
-        self.memory_bot.chat(user_input)
+        if memory_state is None:
+            self.memory_bot.chat(user_input)
+            memory_contents = self.memory_bot.get_memory_contents()
+        else:
+            if update_memory:
+                _, memory_state["messages"] = self.memory_bot.respond(messages, user_input)
+                memory_contents = MemoryBot.format_history(memory_state["messages"])
+            else:
+                # Unchanged since planning, so its rendering is reused
+                memory_contents = history
         
         return {
             "user_input": user_input,
             "decision": decision,
             "response": response,
-            "memory_state": self.memory_bot.get_memory_contents()
+            "memory_state": memory_contents
         }
     
     def get_planning_explanation(self) -> str:
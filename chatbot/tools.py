@@ -13,15 +13,75 @@ This module provides:
 
 import httpx
 import asyncio
-from typing import Dict, Any, Optional, Union
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Dict, Any, List, Optional, Tuple, Union
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 import logging
+import random
+import threading
+import time
 import json
+import orjson
+
+from app.cache import TTLCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by the tools of one ToolManager (keep-alive across calls)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Concurrent async tool calls share one multiplexed connection over HTTP/2
+# when the optional h2 package is installed (negotiated on https:// URLs only)
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# Per-tool caches of successful results; calculator results are pure, while
+# product and outlet data can change, so those expire quickly
+TOOL_CACHE_SIZE = 1024
+CALCULATOR_CACHE_TTL = 3600
+LOOKUP_CACHE_TTL = 60
+
+# Failed connections are retried by the transport; 5xx responses are retried
+# by the tools with jittered exponential backoff (4xx are the caller's error)
+CONNECT_RETRIES = 1
+SERVER_ERROR_RETRIES = 2
+RETRY_BACKOFF = 0.05
+RETRY_JITTER = 0.02
+
+
+def _new_client(**kwargs) -> httpx.Client:
+    """Create a pooled sync client whose transport retries failed connections."""
+    transport = httpx.HTTPTransport(limits=HTTP_LIMITS, retries=CONNECT_RETRIES)
+    return httpx.Client(transport=transport, **kwargs)
+
+
+def _new_async_client(**kwargs) -> httpx.AsyncClient:
+    """Create a pooled async client whose transport retries failed connections."""
+    transport = httpx.AsyncHTTPTransport(limits=HTTP_LIMITS, http2=HTTP2_ENABLED, retries=CONNECT_RETRIES)
+    return httpx.AsyncClient(transport=transport, **kwargs)
+
+
+def _async_client_for(tool: BaseTool) -> httpx.AsyncClient:
+    """Return the tool's async client, creating a private pooled one on first use."""
+    if tool.async_client is None:
+        object.__setattr__(tool, 'async_client', _new_async_client(timeout=tool.timeout))
+    return tool.async_client
+
+
+def _retry_delay(attempt: int) -> float:
+    """Seconds to wait before retrying after the given (0-based) failed attempt."""
+    return RETRY_BACKOFF * 2 ** attempt + random.random() * RETRY_JITTER
+
+
+def _json_body(response: httpx.Response) -> Any:
+    """Parse a JSON response body with orjson, leaving non-UTF-8 bodies to httpx."""
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return response.json()
+
 
 class CalculatorInput(BaseModel):
     """Input schema for calculator tool."""
@@ -38,134 +98,230 @@ class OutletQueryInput(BaseModel):
     query: str = Field(description="Natural language query about outlets (e.g., 'outlets in SS2', 'opening hours KLCC')")
 
 
-class CalculatorTool(BaseTool):
+class HTTPToolBase(BaseTool):
     """
-    LangChain tool for calculator API integration.
+    LangChain tool that answers by GETting one endpoint of the FastAPI service.
     
-    This tool provides safe mathematical expression evaluation through
-    the FastAPI calculator service with comprehensive error handling.
+    Subclasses describe their endpoint, query parameter, response field and
+    messages as class attributes; the request, caching and error handling
+    are shared here, once for the sync and once for the async path.
     """
     
-    name: str = "calculator"
-    description: str = """
-    Evaluate mathematical expressions safely. 
-    Supports basic arithmetic (+, -, *, /, %, **), parentheses, and order of operations.
-    Examples: '2+3', '10*5', '(2+3)*4', '15/3', '2**3'
-    """
-    args_schema: type = CalculatorInput
-    return_direct: bool = False
-    
-    # Custom fields for this tool
+    # Endpoint description, set by each subclass
+    endpoint: ClassVar[str]
+    param_name: ClassVar[str]
+    response_field: ClassVar[str]
+    response_default: ClassVar[Optional[str]] = None
+    success_template: ClassVar[str] = "{result}"
+    cache_ttl: ClassVar[float] = LOOKUP_CACHE_TTL
+    
+    # Message parts, e.g. "Calculator service timed out. Cannot evaluate: 2+"
+    service_label: ClassVar[str]
+    failure_action: ClassVar[str]
+    error_template: ClassVar[str]
+    unexpected_template: ClassVar[str]
+    
+    # Custom fields for all HTTP tools
     base_url: str = "http://localhost:8000"
-    timeout: float = 5.0
+    timeout: float = 10.0
     client: Optional[httpx.Client] = None
+    async_client: Optional[httpx.AsyncClient] = None
+    cache: Optional[TTLCache] = None
     
-    def __init__(self, base_url: str = "http://localhost:8000", timeout: float = 5.0, **kwargs):
+    def __init__(self, base_url: str = "http://localhost:8000", timeout: Optional[float] = None,
+                 client: Optional[httpx.Client] = None,
+                 async_client: Optional[httpx.AsyncClient] = None,
+                 cache_results: bool = True, **kwargs):
         """
-        Initialize calculator tool.
+        Initialize the tool.
         
         Args:
             base_url: Base URL of the FastAPI service
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (the tool's default if omitted)
+            client: Shared HTTP client (a private one is created if omitted)
+            async_client: Shared async HTTP client (a private one is created on
+                          first async call if omitted)
+            cache_results: Serve repeated inputs from an in-process cache
         """
-        super().__init__(base_url=base_url, timeout=timeout, **kwargs)
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        super().__init__(base_url=base_url, **kwargs)
         # Initialize after super().__init__
-        object.__setattr__(self, 'client', httpx.Client(timeout=self.timeout))
-    
-    def _run(self, expression: str) -> str:
+        object.__setattr__(self, 'client', client if client is not None else _new_client(timeout=self.timeout))
+        object.__setattr__(self, 'async_client', async_client)
+        object.__setattr__(
+            self, 'cache', TTLCache(maxsize=TOOL_CACHE_SIZE, ttl=self.cache_ttl) if cache_results else None
+        )
+        # Built once rather than on every call
+        object.__setattr__(self, '_endpoint_url', f"{self.base_url.rstrip('/')}{self.endpoint}")
+    
+    def _request(self, value: str) -> str:
         """
-        Execute calculator tool synchronously.
+        Query the endpoint synchronously.
         
         Args:
-            expression: Mathematical expression to evaluate
+            value: Tool input, sent as the endpoint's query parameter
             
         Returns:
             String containing the result or error message
         """
         try:
-            logger.info(f"Calculator tool called with expression: '{expression}'")
+            logger.debug("%s tool called with input: '%s'", self.service_label, value)
             
-            # Make API request
-            base_url = self.base_url.rstrip('/')
-            response = self.client.get(
-                f"{base_url}/calculator",
-                params={"expr": expression}
-            )
-            
-            # Handle response
-            if response.status_code == 200:
-                data = response.json()
-                result = data.get("result")
-                logger.info(f"Calculator result: {result}")
-                return f"The result of {expression} is {result}"
+            # Results may embed the input as given, so it is the cache key
+            cached = self.cache.get(value) if self.cache is not None else None
+            if cached is not None:
+                return cached
             
-            else:
-                # Handle API errors gracefully
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-                error_msg = error_data.get("error", f"HTTP {response.status_code}")
-                logger.warning(f"Calculator API error: {error_msg}")
-                return f"Error calculating {expression}: {error_msg}"
-        
-        except httpx.ConnectError:
-            logger.error("Calculator API connection failed")
-            return f"Calculator service is currently unavailable. Cannot evaluate: {expression}"
-        
-        except httpx.TimeoutException:
-            logger.error("Calculator API timeout")
-            return f"Calculator service timed out. Cannot evaluate: {expression}"
+            # Make API request, retrying transient server errors
+            for attempt in range(SERVER_ERROR_RETRIES + 1):
+                response = self.client.get(
+                    self._endpoint_url,
+                    params={self.param_name: value},
+                    timeout=self.timeout
+                )
+                if response.status_code < 500 or attempt == SERVER_ERROR_RETRIES:
+                    break
+                logger.debug("%s API returned HTTP %d, retrying", self.service_label, response.status_code)
+                time.sleep(_retry_delay(attempt))
+            return self._handle_response(value, response)
         
         except Exception as e:
-            logger.error(f"Unexpected error in calculator tool: {e}")
-            return f"Unexpected error while calculating {expression}: {str(e)}"
+            return self._handle_error(value, e)
     
-    async def _arun(self, expression: str) -> str:
+    async def _arequest(self, value: str) -> str:
         """
-        Execute calculator tool asynchronously.
+        Query the endpoint asynchronously.
         
         Args:
-            expression: Mathematical expression to evaluate
+            value: Tool input, sent as the endpoint's query parameter
             
         Returns:
             String containing the result or error message
         """
         try:
-            logger.info(f"Calculator tool (async) called with expression: '{expression}'")
+            logger.debug("%s tool (async) called with input: '%s'", self.service_label, value)
+            
+            cached = self.cache.get(value) if self.cache is not None else None
+            if cached is not None:
+                return cached
             
-            base_url = self.base_url.rstrip('/')
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            # Reuse one async client (and its open connections) across calls
+            client = _async_client_for(self)
+            for attempt in range(SERVER_ERROR_RETRIES + 1):
                 response = await client.get(
-                    f"{base_url}/calculator",
-                    params={"expr": expression}
+                    self._endpoint_url,
+                    params={self.param_name: value},
+                    timeout=self.timeout
                 )
-                
-                # Handle response
-                if response.status_code == 200:
-                    data = response.json()
-                    result = data.get("result")
-                    logger.info(f"Calculator result: {result}")
-                    return f"The result of {expression} is {result}"
-                
-                else:
-                    # Handle API errors gracefully
-                    error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-                    error_msg = error_data.get("error", f"HTTP {response.status_code}")
-                    logger.warning(f"Calculator API error: {error_msg}")
-                    return f"Error calculating {expression}: {error_msg}"
-        
-        except httpx.ConnectError:
-            logger.error("Calculator API connection failed")
-            return f"Calculator service is currently unavailable. Cannot evaluate: {expression}"
-        
-        except httpx.TimeoutException:
-            logger.error("Calculator API timeout")
-            return f"Calculator service timed out. Cannot evaluate: {expression}"
+                if response.status_code < 500 or attempt == SERVER_ERROR_RETRIES:
+                    break
+                logger.debug("%s API returned HTTP %d, retrying", self.service_label, response.status_code)
+                await asyncio.sleep(_retry_delay(attempt))
+            return self._handle_response(value, response)
         
         except Exception as e:
-            logger.error(f"Unexpected error in calculator tool: {e}")
-            return f"Unexpected error while calculating {expression}: {str(e)}"
+            return self._handle_error(value, e)
+    
+    def _handle_response(self, value: str, response: httpx.Response) -> str:
+        """Turn an API response into the tool's message, caching successes."""
+        if response.status_code == 200:
+            data = _json_body(response)
+            result = data.get(self.response_field, self.response_default)
+            self._log_success(data, result)
+            message = self.success_template.format(input=value, result=result)
+            if self.cache is not None and self._is_cacheable(data):
+                self.cache.set(value, message)
+            return message
+        
+        # Handle API errors gracefully
+        error_data = _json_body(response) if response.headers.get("content-type", "").startswith("application/json") else {}
+        error_msg = error_data.get("error", f"HTTP {response.status_code}")
+        logger.warning("%s API error: %s", self.service_label, error_msg)
+        return self.error_template.format(input=value, error=error_msg)
+    
+    def _handle_error(self, value: str, error: Exception) -> str:
+        """Turn a failed request into the tool's error message."""
+        if isinstance(error, httpx.ConnectError):
+            logger.error("%s API connection failed", self.service_label)
+            return f"{self.service_label} service is currently unavailable. Cannot {self.failure_action}: {value}"
+        
+        if isinstance(error, httpx.TimeoutException):
+            logger.error("%s API timeout", self.service_label)
+            return f"{self.service_label} service timed out. Cannot {self.failure_action}: {value}"
+        
+        logger.error("Unexpected error in %s tool: %s", self.service_label.lower(), error)
+        return self.unexpected_template.format(input=value, error=str(error))
+    
+    def _log_success(self, data: Dict[str, Any], result: Any):
+        """Log a successful API response."""
+        logger.debug("%s result: %s", self.service_label, result)
+    
+    def _is_cacheable(self, data: Dict[str, Any]) -> bool:
+        """Whether a successful API response may be served from the cache."""
+        return True
+    
+    async def aclose(self):
+        """Close the async HTTP client, if one was opened."""
+        if self.async_client is not None:
+            await self.async_client.aclose()
 
 
-class ProductSearchTool(BaseTool):
+class CalculatorTool(HTTPToolBase):
+    """
+    LangChain tool for calculator API integration.
+    
+    This tool provides safe mathematical expression evaluation through
+    the FastAPI calculator service with comprehensive error handling.
+    """
+    
+    name: str = "calculator"
+    description: str = """
+    Evaluate mathematical expressions safely. 
+    Supports basic arithmetic (+, -, *, /, %, **), parentheses, and order of operations.
+    Examples: '2+3', '10*5', '(2+3)*4', '15/3', '2**3'
+    """
+    args_schema: type = CalculatorInput
+    return_direct: bool = False
+    timeout: float = 5.0
+    
+    endpoint: ClassVar[str] = "/calculator"
+    param_name: ClassVar[str] = "expr"
+    response_field: ClassVar[str] = "result"
+    success_template: ClassVar[str] = "The result of {input} is {result}"
+    cache_ttl: ClassVar[float] = CALCULATOR_CACHE_TTL
+    
+    service_label: ClassVar[str] = "Calculator"
+    failure_action: ClassVar[str] = "evaluate"
+    error_template: ClassVar[str] = "Error calculating {input}: {error}"
+    unexpected_template: ClassVar[str] = "Unexpected error while calculating {input}: {error}"
+    
+    def _run(self, expression: str) -> str:
+        """
+        Execute calculator tool synchronously.
+        
+        Args:
+            expression: Mathematical expression to evaluate
+            
+        Returns:
+            String containing the result or error message
+        """
+        return self._request(expression)
+    
+    async def _arun(self, expression: str) -> str:
+        """
+        Execute calculator tool asynchronously.
+        
+        Args:
+            expression: Mathematical expression to evaluate
+            
+        Returns:
+            String containing the result or error message
+        """
+        return await self._arequest(expression)
+
+
+class ProductSearchTool(HTTPToolBase):
     """
     LangChain tool for product search using RAG.
     
@@ -182,25 +338,31 @@ class ProductSearchTool(BaseTool):
     args_schema: type = ProductSearchInput
     return_direct: bool = False
     
-    # Custom fields for this tool
-    base_url: str = "http://localhost:8000"
-    timeout: float = 10.0
-    client: Optional[httpx.Client] = None
+    endpoint: ClassVar[str] = "/products"
+    param_name: ClassVar[str] = "query"
+    response_field: ClassVar[str] = "summary"
+    response_default: ClassVar[Optional[str]] = "No summary available"
+    
+    service_label: ClassVar[str] = "Product search"
+    failure_action: ClassVar[str] = "search for"
+    error_template: ClassVar[str] = "Error searching for products '{input}': {error}"
+    unexpected_template: ClassVar[str] = "Unexpected error while searching for products '{input}': {error}"
     
-    def __init__(self, base_url: str = "http://localhost:8000", timeout: float = 10.0, **kwargs):
+    def _run(self, query: str) -> str:
         """
-        Initialize product search tool.
+        Execute product search tool synchronously.
         
         Args:
-            base_url: Base URL of the FastAPI service
-            timeout: Request timeout in seconds
+            query: Search query for products
+            
+        Returns:
+            String containing the search results summary
         """
-        super().__init__(base_url=base_url, timeout=timeout, **kwargs)
-        object.__setattr__(self, 'client', httpx.Client(timeout=self.timeout))
+        return self._request(query)
     
-    def _run(self, query: str) -> str:
+    async def _arun(self, query: str) -> str:
         """
-        Execute product search tool synchronously.
+        Execute product search tool asynchronously.
         
         Args:
             query: Search query for products
@@ -208,49 +370,17 @@ class ProductSearchTool(BaseTool):
         Returns:
             String containing the search results summary
         """
-        try:
-            logger.info(f"Product search tool called with query: '{query}'")
-            
-            # Make API request
-            base_url = self.base_url.rstrip('/')
-            response = self.client.get(
-                f"{base_url}/products",
-                params={"query": query}
-            )
-            
-            # Handle response
-            if response.status_code == 200:
-                data = response.json()
-                summary = data.get("summary", "No summary available")
-                logger.info(f"Product search successful: {data.get('total_found', 0)} products found")
-                return summary
-            
-            else:
-                # Handle API errors gracefully
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-                error_msg = error_data.get("error", f"HTTP {response.status_code}")
-                logger.warning(f"Product search API error: {error_msg}")
-                return f"Error searching for products '{query}': {error_msg}"
-        
-        except httpx.ConnectError:
-            logger.error("Product search API connection failed")
-            return f"Product search service is currently unavailable. Cannot search for: {query}"
-        
-        except httpx.TimeoutException:
-            logger.error("Product search API timeout")
-            return f"Product search service timed out. Cannot search for: {query}"
-        
-        except Exception as e:
-            logger.error(f"Unexpected error in product search tool: {e}")
-            return f"Unexpected error while searching for products '{query}': {str(e)}"
+        return await self._arequest(query)
     
-    async def _arun(self, query: str) -> str:
-        """Execute product search tool asynchronously."""
-        # For simplicity, use sync version
-        return self._run(query)
+    def _log_success(self, data: Dict[str, Any], result: Any):
+        logger.info("Product search successful: %s products found", data.get('total_found', 0))
+    
+    def _is_cacheable(self, data: Dict[str, Any]) -> bool:
+        # Empty searches are not cached, matching the API's own cache
+        return data.get('total_found', 0) > 0
 
 
-class OutletQueryTool(BaseTool):
+class OutletQueryTool(HTTPToolBase):
     """
     LangChain tool for outlet queries using Text2SQL.
     
@@ -267,25 +397,31 @@ class OutletQueryTool(BaseTool):
     args_schema: type = OutletQueryInput
     return_direct: bool = False
     
-    # Custom fields for this tool
-    base_url: str = "http://localhost:8000"
-    timeout: float = 10.0
-    client: Optional[httpx.Client] = None
+    endpoint: ClassVar[str] = "/outlets"
+    param_name: ClassVar[str] = "query"
+    response_field: ClassVar[str] = "formatted_response"
+    response_default: ClassVar[Optional[str]] = "No information available"
     
-    def __init__(self, base_url: str = "http://localhost:8000", timeout: float = 10.0, **kwargs):
+    service_label: ClassVar[str] = "Outlet query"
+    failure_action: ClassVar[str] = "process"
+    error_template: ClassVar[str] = "Error querying outlets '{input}': {error}"
+    unexpected_template: ClassVar[str] = "Unexpected error while querying outlets '{input}': {error}"
+    
+    def _run(self, query: str) -> str:
         """
-        Initialize outlet query tool.
+        Execute outlet query tool synchronously.
         
         Args:
-            base_url: Base URL of the FastAPI service
-            timeout: Request timeout in seconds
+            query: Natural language query about outlets
+            
+        Returns:
+            String containing the formatted outlet information
         """
-        super().__init__(base_url=base_url, timeout=timeout, **kwargs)
-        object.__setattr__(self, 'client', httpx.Client(timeout=self.timeout))
+        return self._request(query)
     
-    def _run(self, query: str) -> str:
+    async def _arun(self, query: str) -> str:
         """
-        Execute outlet query tool synchronously.
+        Execute outlet query tool asynchronously.
         
         Args:
             query: Natural language query about outlets
@@ -293,46 +429,14 @@ class OutletQueryTool(BaseTool):
         Returns:
             String containing the formatted outlet information
         """
-        try:
-            logger.info(f"Outlet query tool called with query: '{query}'")
-            
-            # Make API request
-            base_url = self.base_url.rstrip('/')
-            response = self.client.get(
-                f"{base_url}/outlets",
-                params={"query": query}
-            )
-            
-            # Handle response
-            if response.status_code == 200:
-                data = response.json()
-                formatted_response = data.get("formatted_response", "No information available")
-                logger.info(f"Outlet query successful: {data.get('total_results', 0)} outlets found")
-                return formatted_response
-            
-            else:
-                # Handle API errors gracefully
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-                error_msg = error_data.get("error", f"HTTP {response.status_code}")
-                logger.warning(f"Outlet query API error: {error_msg}")
-                return f"Error querying outlets '{query}': {error_msg}"
-        
-        except httpx.ConnectError:
-            logger.error("Outlet query API connection failed")
-            return f"Outlet query service is currently unavailable. Cannot process: {query}"
-        
-        except httpx.TimeoutException:
-            logger.error("Outlet query API timeout")
-            return f"Outlet query service timed out. Cannot process: {query}"
-        
-        except Exception as e:
-            logger.error(f"Unexpected error in outlet query tool: {e}")
-            return f"Unexpected error while querying outlets '{query}': {str(e)}"
+        return await self._arequest(query)
     
-    async def _arun(self, query: str) -> str:
-        """Execute outlet query tool asynchronously."""
-        # For simplicity, use sync version
-        return self._run(query)
+    def _log_success(self, data: Dict[str, Any], result: Any):
+        logger.info("Outlet query successful: %s outlets found", data.get('total_results', 0))
+    
+    def _is_cacheable(self, data: Dict[str, Any]) -> bool:
+        # Queries that errored are not cached, matching the API's own cache
+        return 'error' not in data
 
 
 class ToolManager:
@@ -343,6 +447,13 @@ class ToolManager:
     all tools available to the planner and agent.
     """
     
+    # Available tools by name; each is built on first use
+    TOOL_CLASSES: Dict[str, type] = {
+        "calculator": CalculatorTool,           # Calculator tool
+        "product_search": ProductSearchTool,    # Product search tool (RAG)
+        "outlet_query": OutletQueryTool,        # Outlet query tool (Text2SQL)
+    }
+    
     def __init__(self, base_url: str = "http://localhost:8000"):
         """
         Initialize tool manager.
@@ -352,24 +463,36 @@ class ToolManager:
         """
         self.base_url = base_url
         self._tools = {}
-        self._initialize_tools()
-    
-    def _initialize_tools(self):
-        """Initialize all available tools."""
-        # Calculator tool
-        self._tools["calculator"] = CalculatorTool(base_url=self.base_url)
-        
-        # Product search tool (RAG)
-        self._tools["product_search"] = ProductSearchTool(base_url=self.base_url)
-        
-        # Outlet query tool (Text2SQL)
-        self._tools["outlet_query"] = OutletQueryTool(base_url=self.base_url)
-        
-        logger.info(f"Tool manager initialized with {len(self._tools)} tools")
+        self._tools_lock = threading.Lock()
+        
+        # One pooled client of each kind for every tool, so calls reuse open
+        # connections (the async one is used from a single event loop); both
+        # are opened along with the first tool
+        self.http_client: Optional[httpx.Client] = None
+        self.async_http_client: Optional[httpx.AsyncClient] = None
+        
+        logger.info("Tool manager initialized with %d tools", len(self.TOOL_CLASSES))
+    
+    def _create_tool(self, tool_name: str) -> BaseTool:
+        """Build a tool (and the shared clients, on first use) under the lock."""
+        with self._tools_lock:
+            tool = self._tools.get(tool_name)
+            if tool is not None:
+                return tool
+            
+            if self.http_client is None:
+                self.http_client = _new_client()
+                self.async_http_client = _new_async_client()
+            
+            tool = self.TOOL_CLASSES[tool_name](
+                base_url=self.base_url, client=self.http_client, async_client=self.async_http_client
+            )
+            self._tools[tool_name] = tool
+            return tool
     
     def get_tool(self, tool_name: str) -> Optional[BaseTool]:
         """
-        Get a specific tool by name.
+        Get a specific tool by name, building it on first use.
         
         Args:
             tool_name: Name of the tool to retrieve
@@ -377,27 +500,32 @@ class ToolManager:
         Returns:
             Tool instance or None if not found
         """
-        return self._tools.get(tool_name)
+        tool = self._tools.get(tool_name)
+        if tool is None and tool_name in self.TOOL_CLASSES:
+            tool = self._create_tool(tool_name)
+        return tool
     
     def get_all_tools(self) -> Dict[str, BaseTool]:
         """
-        Get all available tools.
+        Get all available tools, building any not used yet.
         
         Returns:
             Dictionary mapping tool names to tool instances
         """
-        return self._tools.copy()
+        return {name: self.get_tool(name) for name in self.TOOL_CLASSES}
     
     def list_tools(self) -> Dict[str, str]:
         """
         Get a list of all available tools with descriptions.
         
+        Descriptions are read from the tool classes, so no tool is built.
+        
         Returns:
             Dictionary mapping tool names to descriptions
         """
         return {
-            name: tool.description.strip()
-            for name, tool in self._tools.items()
+            name: tool_class.__fields__["description"].default.strip()
+            for name, tool_class in self.TOOL_CLASSES.items()
         }
     
     def execute_tool(self, tool_name: str, **kwargs) -> str:
@@ -414,10 +542,7 @@ class ToolManager:
         Raises:
             ValueError: If tool is not found
         """
-        tool = self.get_tool(tool_name)
-        if tool is None:
-            available_tools = ", ".join(self._tools.keys())
-            raise ValueError(f"Tool '{tool_name}' not found. Available tools: {available_tools}")
+        tool = self._require_tool(tool_name)
         
         try:
             # Pass parameters directly if it's a single parameter
@@ -426,9 +551,89 @@ class ToolManager:
             else:
                 return tool.run(kwargs)
         except Exception as e:
-            logger.error(f"Error executing tool {tool_name}: {e}")
+            logger.error("Error executing tool %s: %s", tool_name, e)
             return f"Error executing {tool_name}: {str(e)}"
     
+    async def execute_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Execute several tools concurrently, overlapping their HTTP round-trips.
+        
+        Args:
+            calls: (tool name, parameters) pairs, as passed to execute_tool()
+            
+        Returns:
+            Tool execution results, in the order of calls
+            
+        Raises:
+            ValueError: If any tool is not found (before any call is made)
+        """
+        tools = [(tool_name, self._require_tool(tool_name)) for tool_name, _ in calls]
+        
+        results = await asyncio.gather(
+            *(self._arun_tool(tool, kwargs) for (_, tool), (_, kwargs) in zip(tools, calls)),
+            return_exceptions=True
+        )
+        
+        # A failing tool does not cancel the others; report it like execute_tool()
+        outputs = []
+        for (tool_name, _), result in zip(tools, results):
+            if isinstance(result, BaseException):
+                logger.error("Error executing tool %s: %s", tool_name, result)
+                result = f"Error executing {tool_name}: {str(result)}"
+            outputs.append(result)
+        return outputs
+    
+    def execute_tools_batch_sync(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Execute several tools concurrently from synchronous code.
+        
+        Uses worker threads over the shared sync client rather than a new
+        event loop, which the async client's pooled connections are tied to.
+        
+        Args:
+            calls: (tool name, parameters) pairs, as passed to execute_tool()
+            
+        Returns:
+            Tool execution results, in the order of calls
+            
+        Raises:
+            ValueError: If any tool is not found (before any call is made)
+        """
+        for tool_name, _ in calls:
+            self._require_tool(tool_name)
+        if len(calls) <= 1:
+            return [self.execute_tool(tool_name, **kwargs) for tool_name, kwargs in calls]
+        
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = [executor.submit(self.execute_tool, tool_name, **kwargs) for tool_name, kwargs in calls]
+            return [future.result() for future in futures]
+    
+    def _require_tool(self, tool_name: str) -> BaseTool:
+        """Get a tool by name, raising ValueError if it is not found."""
+        tool = self.get_tool(tool_name)
+        if tool is None:
+            available_tools = ", ".join(self.TOOL_CLASSES)
+            raise ValueError(f"Tool '{tool_name}' not found. Available tools: {available_tools}")
+        return tool
+    
+    @staticmethod
+    async def _arun_tool(tool: BaseTool, kwargs: Dict[str, Any]) -> str:
+        """Run a tool asynchronously, passing parameters as execute_tool() does."""
+        if len(kwargs) == 1 and 'expression' in kwargs:
+            return await tool.arun(kwargs['expression'])
+        return await tool.arun(kwargs)
+    
+    def close(self):
+        """Close the shared HTTP client and its pooled connections, if opened."""
+        if self.http_client is not None:
+            self.http_client.close()
+    
+    async def aclose(self):
+        """Close both shared HTTP clients and their pooled connections, if opened."""
+        self.close()
+        if self.async_http_client is not None:
+            await self.async_http_client.aclose()
+    
     def test_tool_connectivity(self) -> Dict[str, bool]:
         """
         Test connectivity to all external tools/APIs.
@@ -444,7 +649,7 @@ class ToolManager:
             test_result = calculator.run("2+2")
             results["calculator"] = "result" in test_result.lower()
         except Exception as e:
-            logger.warning(f"Calculator connectivity test failed: {e}")
+            logger.warning("Calculator connectivity test failed: %s", e)
             results["calculator"] = False
         
         return results
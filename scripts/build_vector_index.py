@@ -10,13 +10,19 @@ Required for assessment deliverable: "Vector-store ingestion scripts"
 
 import json
 import logging
+import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import numpy as np
 
 # Vector store and embeddings
 import faiss
-from sentence_transformers import SentenceTransformer
+
+# Add the project root to the path for the service's encoder and index files
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.encoder import DEFAULT_ONNX_MODEL_DIR, encoder_identity, load_encoder
+from app.rag_service import save_index_artifacts
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,7 +40,8 @@ class VectorIndexBuilder:
     def __init__(self, 
                  model_name: str = "all-MiniLM-L6-v2",
                  products_file: str = "data/zus_products.json",
-                 index_file: str = "data/product_index.faiss"):
+                 index_file: str = "data/product_index_hnsw_sq8.faiss",
+                 onnx_model_dir: Optional[str] = DEFAULT_ONNX_MODEL_DIR):
         """
         Initialize the vector index builder.
         
@@ -42,14 +49,17 @@ class VectorIndexBuilder:
             model_name: SentenceTransformers model name
             products_file: Input products JSON file
             index_file: Output FAISS index file
+            onnx_model_dir: Directory of an ONNX export of the model, used if present
         """
         self.model_name = model_name
         self.products_file = products_file
         self.index_file = index_file
         
-        # Initialize sentence transformer
+        # Initialize the same sentence encoder the RAG service loads, so the
+        # service accepts the index and its sidecars without re-encoding
         logger.info(f"Loading SentenceTransformers model: {model_name}")
-        self.encoder = SentenceTransformer(model_name)
+        self.encoder = load_encoder(model_name, onnx_model_dir)
+        self.encoder_id = encoder_identity(self.encoder, model_name)
         self.embedding_dim = self.encoder.get_sentence_embedding_dimension()
         logger.info(f"Model loaded. Embedding dimension: {self.embedding_dim}")
     
@@ -137,7 +147,7 @@ class VectorIndexBuilder:
             logger.error(f"Error generating embeddings: {e}")
             return np.array([])
     
-    def build_faiss_index(self, embeddings: np.ndarray) -> Optional[faiss.IndexFlatIP]:
+    def build_faiss_index(self, embeddings: np.ndarray) -> Optional[faiss.IndexHNSWSQ]:
         """
         Build FAISS index from embeddings.
         
@@ -150,15 +160,19 @@ class VectorIndexBuilder:
         try:
             logger.info("Building FAISS index...")
             
-            # Create FAISS index (Inner Product for cosine similarity)
-            index = faiss.IndexFlatIP(self.embedding_dim)
+            # Create HNSW graph index over 8-bit scalar-quantized vectors
+            # (Inner Product for cosine similarity)
+            index = faiss.IndexHNSWSQ(self.embedding_dim, faiss.ScalarQuantizer.QT_8bit,
+                                      32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 80
             
             # Normalize embeddings for cosine similarity
-            embeddings_copy = embeddings.copy()
+            embeddings_copy = embeddings.astype(np.float32)
             faiss.normalize_L2(embeddings_copy)
             
-            # Add embeddings to index
-            index.add(embeddings_copy.astype(np.float32))
+            # Train the quantizer ranges, then add embeddings to index
+            index.train(embeddings_copy)
+            index.add(embeddings_copy)
             
             logger.info(f"Built FAISS index with {index.ntotal} vectors")
             return index
@@ -167,19 +181,19 @@ class VectorIndexBuilder:
             logger.error(f"Error building FAISS index: {e}")
             return None
     
-    def save_index(self, index: faiss.IndexFlatIP):
+    def save_index(self, index: faiss.Index, products: List[Dict[str, Any]], embeddings: np.ndarray):
         """
-        Save FAISS index to file.
+        Save FAISS index to file, with the sidecars the RAG service loads.
         
         Args:
             index: FAISS index to save
+            products: Products the index was built from
+            embeddings: Normalized embeddings the index was built from
         """
         try:
-            # Ensure output directory exists
-            Path(self.index_file).parent.mkdir(parents=True, exist_ok=True)
-            
-            # Save index
-            faiss.write_index(index, self.index_file)
+            # Index, embeddings, parsed catalog and encoder identity
+            save_index_artifacts(index, products, embeddings, self.encoder_id,
+                                 self.index_file, self.products_file)
             
             logger.info(f"Saved FAISS index to {self.index_file}")
             
@@ -210,6 +224,10 @@ class VectorIndexBuilder:
             logger.error("No embeddings generated. Cannot build index.")
             return
         
+        # Normalize embeddings for cosine similarity (saved as the service expects)
+        embeddings = embeddings.astype(np.float32)
+        faiss.normalize_L2(embeddings)
+        
         # Build FAISS index
         index = self.build_faiss_index(embeddings)
         if index is None:
@@ -217,7 +235,7 @@ class VectorIndexBuilder:
             return
         
         # Save index
-        self.save_index(index)
+        self.save_index(index, products, embeddings)
         
         logger.info("Vector index building completed successfully!")
         logger.info(f"Index contains {index.ntotal} product embeddings")
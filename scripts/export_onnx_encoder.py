@@ -0,0 +1,60 @@
+"""
+Export Sentence Encoder to ONNX - Phase 4
+=========================================
+
+Exports the RAG sentence transformer to ONNX and quantizes it to int8 so the
+API can embed queries with ONNX Runtime instead of PyTorch.
+
+Requires: pip install "optimum[onnxruntime]"
+
+Equivalent CLI:
+    optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 \\
+        --task feature-extraction models/minilm-onnx
+    optimum-cli onnxruntime quantize --onnx_model models/minilm-onnx --avx512 -o models/minilm-onnx
+"""
+
+import logging
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def export_encoder(model_id: str = "sentence-transformers/all-MiniLM-L6-v2",
+                   output_dir: str = "models/minilm-onnx"):
+    """
+    Export and quantize the sentence encoder.
+    
+    Args:
+        model_id: Hugging Face model ID to export
+        output_dir: Directory receiving model.onnx, model_quantized.onnx and tokenizer files
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    
+    # Export the transformer graph and its tokenizer
+    logger.info(f"Exporting {model_id} to ONNX...")
+    model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(output_dir)
+    
+    # Dynamic int8 quantization tuned for AVX-512 CPUs
+    logger.info("Quantizing ONNX model to int8...")
+    quantizer = ORTQuantizer.from_pretrained(output_dir)
+    quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=output_dir, quantization_config=quantization_config)
+    
+    logger.info(f"Saved ONNX encoder to {output_dir}")
+
+
+def main():
+    """Main function to export the encoder."""
+    export_encoder()
+
+
+if __name__ == "__main__":
+    main()
@@ -83,7 +83,7 @@ def run_complete_pipeline():
         logger.info(f"     - data/zus_products.json")
         logger.info(f"     - data/zus_outlets.json")
         logger.info(f"     - data/zus_outlets.db")
-        logger.info(f"     - data/product_index.faiss")
+        logger.info(f"     - data/product_index_hnsw_sq8.faiss")
         
         return True
         
@@ -103,7 +103,7 @@ def verify_outputs():
         "data/zus_products.json",
         "data/zus_outlets.json", 
         "data/zus_outlets.db",
-        "data/product_index.faiss"
+        "data/product_index_hnsw_sq8.faiss"
     ]
     
     logger.info("Verifying output files...")
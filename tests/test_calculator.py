@@ -17,6 +17,7 @@ import pytest
 import sys
 import os
 import httpx
+import json
 from unittest.mock import patch, MagicMock
 import asyncio
 
@@ -112,6 +113,13 @@ class TestCalculatorService:
             with pytest.raises(ValueError):
                 self.calculator.evaluate_expression(expr)
     
+    def test_expression_length_limit(self):
+        """Test that over-length expressions are rejected before parsing."""
+        from app.calculator import MAX_EXPRESSION_LENGTH
+        
+        with pytest.raises(ValueError, match="too long"):
+            self.calculator.evaluate_expression("1+" * MAX_EXPRESSION_LENGTH + "1")
+    
     def test_expression_normalization(self):
         """Test that expressions are normalized correctly."""
         test_cases = [
@@ -132,6 +140,102 @@ class TestCalculatorService:
         """Test the convenience calculate function."""
         result = calculate("2 + 3")
         assert result == 5
+    
+    def test_big_integer_results_render(self):
+        """Test that results wider than 64 bits still render as exact JSON."""
+        from app.responses import FastJSONResponse, render_json
+        
+        result = self.calculator.evaluate_expression("2**64")
+        response = FastJSONResponse({"expression": "2**64", "result": result})
+        
+        assert json.loads(response.body) == {"expression": "2**64", "result": 18446744073709551616}
+        assert json.loads(render_json({"result": result})) == {"result": 18446744073709551616}
+    
+    def test_fast_path_matches_ast_evaluation(self):
+        """Test that the shunting-yard fast path follows Python's precedence rules."""
+        test_cases = [
+            ("-2 ** 2", -4),
+            ("2 ** -1", 0.5),
+            ("2 ** 3 ** 2", 512),
+            ("-2 * 3 + 4", -2),
+            ("2 + + 3", 5),
+            ("((1 + 2) * (3 + 4) - 5) / 8", 2.0),
+        ]
+        
+        for expression, expected in test_cases:
+            assert self.calculator._fast_eval(expression) == expected
+            assert self.calculator.evaluate_expression(expression) == expected
+        
+        # Malformed input is left to the AST path for error reporting
+        assert self.calculator._fast_eval("2 +") is None
+        assert self.calculator._fast_eval("(2") is None
+    
+    def test_trivial_expressions(self):
+        """Test the short-circuit for bare numbers and single integer binops."""
+        test_cases = [
+            ("5", 5),
+            ("-3.5", -3.5),
+            ("10 * 5", 50),
+            ("15/3", 5.0),
+        ]
+        
+        for expression, expected in test_cases:
+            result = self.calculator.evaluate_expression(expression)
+            assert result == expected and type(result) is type(expected)
+        
+        with pytest.raises(ZeroDivisionError):
+            self.calculator.evaluate_expression("10/0")
+        with pytest.raises(ValueError):
+            self.calculator.evaluate_expression("007")
+    
+    def test_trivial_powers_get_result_validation(self):
+        """Test that a bare integer power is validated like any other power."""
+        assert self.calculator.evaluate_expression("2**10") == 1024
+        
+        for expression in ("10**400", "(10)**400", "1+10**400"):
+            with pytest.raises(OverflowError):
+                self.calculator.evaluate_expression(expression)
+    
+    def test_hot_expression_shapes_are_specialized(self):
+        """Test that a recurring expression shape gets a generated evaluator."""
+        from app.calculator import _SHAPE_FUNCTIONS, _SPECIALIZE_AFTER
+        
+        shape = (None, '+', None, '*', '(', None, '-', None, ')')
+        for i in range(_SPECIALIZE_AFTER + 2):
+            expression = f"{i} + 2 * ({i + 3} - 1)"
+            assert self.calculator.evaluate_expression(expression) == i + 2 * (i + 2)
+        
+        assert shape in _SHAPE_FUNCTIONS
+        assert self.calculator._fast_eval("1 + 2 * (3.5 - 1)") == 6.0
+    
+    def test_hot_division_shapes_keep_zero_checks(self):
+        """Test that zero divisors raise the same error however often a shape is seen."""
+        from app.calculator import _SPECIALIZE_AFTER
+        
+        for i in range(1, _SPECIALIZE_AFTER + 3):
+            with pytest.raises(ZeroDivisionError, match="^Division by zero$"):
+                self.calculator.evaluate_expression(f"{i} / 0.0")
+            with pytest.raises(ZeroDivisionError, match="^Modulo by zero$"):
+                self.calculator.evaluate_expression(f"{i} % 0.0")
+    
+    def test_repeated_expressions_are_memoized(self):
+        """Test that identical normalized expressions hit the result cache."""
+        assert self.calculator.evaluate_expression("(7 * 6) + 0") == 42
+        assert self.calculator.evaluate_expression("  (7  *  6)  +  0 ") == 42
+        
+        info = self.calculator._eval_cached.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+    
+    def test_result_cache_is_per_instance(self):
+        """Test that a subclass's evaluations are not served from another instance's cache."""
+        class DoublingCalculator(CalculatorService):
+            def _evaluate_normalized(self, expression):
+                return 2 * super()._evaluate_normalized(expression)
+        
+        assert self.calculator.evaluate_expression("(1 + 2) * 3") == 9
+        assert DoublingCalculator().evaluate_expression("(1 + 2) * 3") == 18
+        assert self.calculator.evaluate_expression("(1 + 2) * 3") == 9
 
 
 class TestCalculatorTool:
@@ -161,6 +265,21 @@ class TestCalculatorTool:
         assert "result of 2+3 is 5" in result.lower()
         mock_get.assert_called_once()
     
+    @patch('httpx.Client.get')
+    def test_repeated_calculation_is_cached(self, mock_get):
+        """Test that repeated expressions skip the API and failures are not cached."""
+        mock_get.side_effect = httpx.ConnectError("Connection failed")
+        assert "unavailable" in self.tool.run("2+3").lower()
+        
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"result": 5}
+        mock_get.side_effect = None
+        mock_get.return_value = mock_response
+        
+        assert self.tool.run("2+3") == self.tool.run("2+3") == "The result of 2+3 is 5"
+        assert mock_get.call_count == 2
+    
     @patch('httpx.Client.get')
     def test_api_error_handling(self, mock_get):
         """Test API error handling in tool."""
@@ -176,6 +295,19 @@ class TestCalculatorTool:
         assert "error calculating" in result.lower()
         assert "invalid expression" in result.lower()
     
+    @patch('chatbot.tools.time.sleep')
+    @patch('httpx.Client.get')
+    def test_server_error_is_retried(self, mock_get, mock_sleep):
+        """Test that 5xx responses are retried while 4xx responses are not."""
+        unavailable = MagicMock(status_code=503, headers={})
+        success = MagicMock(status_code=200)
+        success.json.return_value = {"result": 5}
+        mock_get.side_effect = [unavailable, success]
+        
+        assert self.tool.run("2+3") == "The result of 2+3 is 5"
+        assert mock_get.call_count == 2
+        mock_sleep.assert_called_once()
+    
     @patch('httpx.Client.get')
     def test_connection_error_handling(self, mock_get):
         """Test connection error handling in tool."""
@@ -249,6 +381,25 @@ class TestToolManager:
         result = self.manager.execute_tool("calculator", expression="2+3")
         
         assert "error executing calculator" in result.lower()
+    
+    @patch('chatbot.tools.ProductSearchTool.arun')
+    @patch('chatbot.tools.CalculatorTool.arun')
+    def test_execute_tools_batch(self, mock_calc_arun, mock_product_arun):
+        """Test that batched tools keep call order and isolate failures."""
+        mock_calc_arun.return_value = "The result of 2+3 is 5"
+        mock_product_arun.side_effect = Exception("Tool error")
+        
+        results = asyncio.run(self.manager.execute_tools_batch([
+            ("calculator", {"expression": "2+3"}),
+            ("product_search", {"query": "tumbler"})
+        ]))
+        
+        assert results[0] == "The result of 2+3 is 5"
+        assert "error executing product_search" in results[1].lower()
+        mock_calc_arun.assert_called_once_with("2+3")
+        
+        with pytest.raises(ValueError, match="Tool 'invalid' not found"):
+            asyncio.run(self.manager.execute_tools_batch([("invalid", {"query": "x"})]))
 
 
 class TestPlannerToolIntegration:
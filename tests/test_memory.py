@@ -309,6 +309,21 @@ class TestMemoryIntegration:
         # Memory should be cumulative
         assert "First message" in memory_after_second or "first message" in memory_after_second.lower()
         assert "Second message" in memory_after_second or "second message" in memory_after_second.lower()
+    
+    def test_memory_export_and_load_roundtrip(self):
+        """Test that exported messages rebuild an identical memory in a fresh bot."""
+        self.bot.chat("Is there an outlet in Petaling Jaya?")
+        self.bot.chat("SS2, what's the opening time?")
+        
+        messages = self.bot.export_messages()
+        assert [message["role"] for message in messages] == ["human", "ai", "human", "ai"]
+        
+        restored = MemoryBot()
+        restored.chat("Unrelated message")
+        restored.load(messages)
+        
+        assert restored.export_messages() == messages
+        assert restored.get_memory_contents() == self.bot.get_memory_contents()
 
 
 # Test runner for Phase 1
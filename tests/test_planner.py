@@ -278,6 +278,26 @@ class TestPlannerBot:
         # If it's ASK, it should be asking for query type
         if decision.action == ActionType.ASK:
             assert "what would you like to know" in decision.parameters.get("message", "").lower()
+    
+    def test_conversation_turn_with_external_memory_state(self):
+        """Test that one planner can serve separate conversations via explicit memory state."""
+        reference = PlannerBot()
+        first = {"messages": []}
+        second = {"messages": []}
+        
+        for message in ["Hello", "Is there an outlet in Petaling Jaya?", "SS2, what's the opening time?"]:
+            expected = reference.execute_conversation_turn(message)
+            result = self.planner.execute_conversation_turn(message, memory_state=first)
+            
+            assert result["decision"].action == expected["decision"].action
+            assert result["memory_state"] == expected["memory_state"]
+        
+        self.planner.execute_conversation_turn("Hi", memory_state=second)
+        
+        # The planner's own memory and the other conversation are untouched
+        assert self.planner.memory_bot.get_memory_contents() == ""
+        assert len(first["messages"]) == 6
+        assert [m["content"] for m in second["messages"] if m["role"] == "human"] == ["Hi"]
 
 
 class TestPlannerDecision: